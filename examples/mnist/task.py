@@ -17,12 +17,16 @@ class MNIST(Task):
             label_key="label",
             input_dtype=tf.float32,
             label_dtype=tf.int32,
+            input_storage_dtype=tf.uint8,
         )
 
     def dataset_partitioner(self) -> DatasetPartitioner:
         return IidPartitioner()
 
     def preprocess_dataset(self, dataset: Dataset, training: bool) -> Dataset:
+        return dataset
+
+    def preprocess_batch(self, dataset: Dataset, training: bool) -> Dataset:
         return Dataset(x=tf.divide(dataset.x, 255.0), y=dataset.y)
 
     def model(self) -> models.Model:
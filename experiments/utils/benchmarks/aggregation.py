@@ -0,0 +1,134 @@
+import sys
+import time
+from itertools import cycle, islice
+
+import numpy as np
+from flwr.common import Code, FitRes, Parameters, Status, parameters_to_ndarrays
+from flwr.server.strategy.aggregate import aggregate_inplace
+
+from netfl.core.strategy import FlatWeightedSum, WeightedSum
+from netfl.utils.flat import FlatLayout
+from netfl.utils.weights import arrays_to_parameters
+
+
+CLIENTS = (8, 64, 256, 1024)
+PARAMETERS = (1_000_000, 10_000_000, 50_000_000)
+NUM_LAYERS = 8
+POOL_SIZE = 8
+
+
+def layer_shapes(num_params: int) -> list[tuple[int, ...]]:
+    sizes = np.full(NUM_LAYERS, num_params // NUM_LAYERS)
+    sizes[-1] += num_params - sizes.sum()
+    return [(int(size),) for size in sizes]
+
+
+def client_results(
+    num_clients: int, pool: list[Parameters], rng: np.random.Generator
+) -> list[tuple[None, FitRes]]:
+    return [
+        (
+            None,
+            FitRes(
+                status=Status(code=Code.OK, message="Success"),
+                parameters=parameters,
+                num_examples=int(rng.integers(100, 1000)),
+                metrics={},
+            ),
+        )
+        for parameters in islice(cycle(pool), num_clients)
+    ]
+
+
+def run(aggregate: WeightedSum, results: list[tuple[None, FitRes]]) -> list:
+    for client, fit_res in results:
+        aggregate.add(client, fit_res)  # type: ignore[arg-type]
+    return parameters_to_ndarrays(aggregate.result().parameters)
+
+
+def measure(fn) -> tuple[float, list]:
+    start_time = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start_time) * 1000, result
+
+
+def max_difference(a: list, b: list) -> float:
+    return max(float(np.abs(x - y).max()) for x, y in zip(a, b))
+
+
+def benchmark(num_threads: int, batch_size: int, memory_budget_mb: int) -> None:
+    rng = np.random.default_rng(42)
+
+    for num_params in PARAMETERS:
+        shapes = layer_shapes(num_params)
+        global_weights = [np.zeros(shape, dtype=np.float32) for shape in shapes]
+        layout = FlatLayout.from_arrays(global_weights)
+        pool = [
+            arrays_to_parameters(
+                [rng.standard_normal(shape, dtype=np.float32) for shape in shapes]
+            )
+            for _ in range(POOL_SIZE)
+        ]
+
+        for num_clients in CLIENTS:
+            results = client_results(num_clients, pool, rng)
+            print(f"{num_clients} clients x {num_params} parameters:")
+
+            timings = {
+                "per layer": measure(lambda: run(WeightedSum(global_weights), results)),
+                "flat (1 thread)": measure(
+                    lambda: run(
+                        FlatWeightedSum(global_weights, layout, batch_size, 1), results
+                    )
+                ),
+            }
+            if num_threads > 1:
+                timings[f"flat ({num_threads} threads)"] = measure(
+                    lambda: run(
+                        FlatWeightedSum(
+                            global_weights, layout, batch_size, num_threads
+                        ),
+                        results,
+                    )
+                )
+
+            if num_clients * num_params * 4 / (1024**2) <= memory_budget_mb:
+                timings["flower aggregate_inplace"] = measure(
+                    lambda: aggregate_inplace(results)  # type: ignore[arg-type]
+                )
+            else:
+                print("  flower aggregate_inplace: skipped (exceeds memory budget)")
+
+            reference = timings["per layer"][1]
+            for name, (latency_ms, weights) in timings.items():
+                print(
+                    f"  {name}: {latency_ms:.1f} ms "
+                    f"(max difference {max_difference(weights, reference):.2e})"
+                )
+
+
+def validate_args(args: list[str]) -> tuple[int, int, int]:
+    if len(args) > 4:
+        raise ValueError(
+            "Usage: python aggregation.py [threads] [batch_size] [memory_budget_mb]"
+        )
+
+    num_threads = int(args[1]) if len(args) >= 2 else 4
+    batch_size = int(args[2]) if len(args) >= 3 else 8
+    memory_budget_mb = int(args[3]) if len(args) == 4 else 4096
+
+    if num_threads <= 0 or batch_size <= 0 or memory_budget_mb <= 0:
+        raise ValueError("All arguments must be positive.")
+
+    return num_threads, batch_size, memory_budget_mb
+
+
+if __name__ == "__main__":
+    try:
+        benchmark(*validate_args(sys.argv))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,128 @@
+import sys
+import time
+from statistics import median
+
+import numpy as np
+from keras import optimizers
+
+from netfl.core.models import cnn3
+from netfl.utils.codecs import get_codec
+from netfl.utils.compression import (
+    COMPRESSORS,
+    Compressor,
+    compress_parameters,
+    decompress_parameters,
+    get_compressor,
+)
+from netfl.utils.weights import WeightsSerializer, arrays_to_parameters
+
+
+def cnn3_update(epochs: int, seed: int) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    model = cnn3((32, 32, 3), 10, optimizers.SGD(learning_rate=0.01))
+    serializer = WeightsSerializer(model)
+    global_weights = [array.copy() for array in serializer.arrays()]
+
+    x = rng.random((1024, 32, 32, 3), dtype=np.float32)
+    y = rng.integers(0, 10, 1024)
+    model.fit(x, y, batch_size=32, epochs=epochs, verbose=0)
+
+    return global_weights, serializer.arrays()
+
+
+def measure(fn, repeats: int) -> float:
+    fn()
+    times = []
+
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start_time)
+
+    return median(times) * 1000
+
+
+def benchmark_case(
+    name: str,
+    arrays: list[np.ndarray],
+    codec_name: str,
+    compressor: Compressor,
+    compute_units: float,
+    repeats: int,
+) -> None:
+    parameters = (
+        get_codec(codec_name).encode(arrays)
+        if codec_name != "none"
+        else arrays_to_parameters(arrays)
+    )
+    raw_size = sum(len(tensor) for tensor in parameters.tensors)
+    compressed = compress_parameters(parameters, compressor)
+    compressed_size = sum(len(tensor) for tensor in compressed.tensors)
+
+    encode_ms = measure(lambda: compress_parameters(parameters, compressor), repeats)
+    decode_ms = measure(lambda: decompress_parameters(compressed), repeats)
+
+    print(
+        f"  {name:<8} {codec_name:<5} {compressor.name}-{compressor.level:<3} "
+        f"{raw_size / 1024:>8.0f} KB -> {compressed_size / 1024:>7.0f} KB "
+        f"(x{raw_size / compressed_size:.2f}), "
+        f"encode {encode_ms:.1f} ms ({encode_ms / compute_units:.1f} ms at "
+        f"{compute_units} CU), "
+        f"decode {decode_ms:.1f} ms ({decode_ms / compute_units:.1f} ms at "
+        f"{compute_units} CU)"
+    )
+
+
+def available_compressors() -> list[Compressor]:
+    compressors = []
+
+    for name in COMPRESSORS:
+        try:
+            compressors.append(get_compressor(name))
+        except RuntimeError as e:
+            print(f"Skipping {name}: {e}")
+
+    return compressors
+
+
+def benchmark(compute_units: float, repeats: int) -> None:
+    global_weights, weights = cnn3_update(epochs=1, seed=42)
+    delta = [
+        weight - global_weight for weight, global_weight in zip(weights, global_weights)
+    ]
+    compressors = available_compressors()
+
+    print(f"cnn3 (CIFAR-10 shape): {sum(w.size for w in weights)} parameters")
+    for compressor in compressors:
+        for name, arrays in (("weights", weights), ("delta", delta)):
+            for codec_name in ("none", "fp16", "int8"):
+                benchmark_case(
+                    name, arrays, codec_name, compressor, compute_units, repeats
+                )
+
+
+def validate_args(args: list[str]) -> tuple[float, int]:
+    if len(args) > 3:
+        raise ValueError("Usage: python compression.py [compute_units] [repeats]")
+
+    compute_units = float(args[1]) if len(args) >= 2 else 0.5
+    if not 0 < compute_units <= 1:
+        raise ValueError("The compute units must be in (0, 1].")
+
+    repeats = int(args[2]) if len(args) == 3 else 10
+    if repeats <= 0:
+        raise ValueError("The number of repeats must be positive.")
+
+    return compute_units, repeats
+
+
+if __name__ == "__main__":
+    try:
+        compute_units, repeats = validate_args(sys.argv)
+        benchmark(compute_units, repeats)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,97 @@
+import sys
+import time
+import warnings
+
+import numpy as np
+import datasets
+from flwr_datasets.partitioner import DirichletPartitioner
+
+from netfl.utils.partitions import NativeDirichletPartitioner
+
+
+ALPHAS = (0.05, 0.1, 0.5, 1.0)
+NUM_PARTITIONS = (10, 100, 1000)
+
+
+def measure(partitioner) -> tuple[float | None, int | None]:
+    start_time = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            num_partitions = partitioner.num_partitions
+    except ValueError:
+        return None, None
+    elapsed_time = time.perf_counter() - start_time
+
+    if isinstance(partitioner, NativeDirichletPartitioner):
+        sizes = partitioner.partition_index.sizes()
+    else:
+        sizes = [
+            len(partitioner._partition_id_to_indices[partition_id])
+            for partition_id in range(num_partitions)
+        ]
+
+    return elapsed_time, int(min(sizes))
+
+
+def format_result(elapsed_time: float | None, min_size: int | None) -> str:
+    if elapsed_time is None:
+        return "failed after 10 attempts"
+    return f"{elapsed_time:.3f}s (min size {min_size})"
+
+
+def validate_args(args: list[str]) -> tuple[int, int, int]:
+    if len(args) not in (1, 4):
+        raise ValueError(
+            "Usage: python dirichlet_partitioner.py [num_rows num_classes min_partition_size]"
+        )
+
+    if len(args) == 1:
+        return 60_000, 10, 10
+
+    num_rows, num_classes, min_partition_size = (int(arg) for arg in args[1:])
+    if min(num_rows, num_classes) <= 0 or min_partition_size < 0:
+        raise ValueError("Invalid arguments.")
+
+    return num_rows, num_classes, min_partition_size
+
+
+if __name__ == "__main__":
+    try:
+        num_rows, num_classes, min_partition_size = validate_args(sys.argv)
+        labels = np.random.default_rng(0).integers(0, num_classes, num_rows)
+        dataset = datasets.Dataset.from_dict({"label": labels}).shuffle(seed=42)
+
+        print(
+            f"{num_rows} rows, {num_classes} classes, "
+            f"min_partition_size={min_partition_size}"
+        )
+        for num_partitions in NUM_PARTITIONS:
+            if num_partitions * min_partition_size > num_rows:
+                continue
+            for alpha in ALPHAS:
+                results = []
+                for partitioner_cls in (
+                    DirichletPartitioner,
+                    NativeDirichletPartitioner,
+                ):
+                    partitioner = partitioner_cls(
+                        num_partitions=num_partitions,
+                        partition_by="label",
+                        alpha=alpha,
+                        min_partition_size=min_partition_size,
+                        seed=42,
+                    )
+                    partitioner.dataset = dataset
+                    results.append(format_result(*measure(partitioner)))
+
+                print(
+                    f"partitions={num_partitions} alpha={alpha}: "
+                    f"flwr {results[0]}, native {results[1]}"
+                )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,82 @@
+import sys
+import time
+import warnings
+
+import numpy as np
+import datasets
+
+from legacy_partitioners import PathologicalPartitioner as LegacyPathologicalPartitioner
+from netfl.external.partitioners import PathologicalPartitioner
+
+
+def measure(partitioner_cls, dataset: datasets.Dataset, num_partitions: int) -> tuple:
+    partitioner = partitioner_cls(
+        num_partitions=num_partitions,
+        partition_by="label",
+        num_classes_per_partition=2,
+        class_assignment_mode="random",
+        seed=42,
+    )
+    partitioner.dataset = dataset
+
+    start_time = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        partitioner.num_partitions
+    elapsed_time = time.perf_counter() - start_time
+
+    return partitioner, elapsed_time
+
+
+def same_partitions(legacy, vectorized, num_partitions: int) -> bool:
+    return all(
+        np.array_equal(
+            legacy._partition_id_to_indices[partition_id],
+            vectorized.partition_index.partition(partition_id),
+        )
+        for partition_id in range(num_partitions)
+    )
+
+
+def validate_args(args: list[str]) -> tuple[int, int, int]:
+    if len(args) not in (1, 4):
+        raise ValueError(
+            "Usage: python pathological_partitioner.py [num_rows num_partitions num_classes]"
+        )
+
+    if len(args) == 1:
+        return 1_000_000, 10_000, 10
+
+    num_rows, num_partitions, num_classes = (int(arg) for arg in args[1:])
+    if min(num_rows, num_partitions, num_classes) <= 0:
+        raise ValueError("All arguments must be positive.")
+
+    return num_rows, num_partitions, num_classes
+
+
+if __name__ == "__main__":
+    try:
+        num_rows, num_partitions, num_classes = validate_args(sys.argv)
+        labels = np.random.default_rng(0).integers(0, num_classes, num_rows)
+        dataset = datasets.Dataset.from_dict({"label": labels}).shuffle(seed=42)
+
+        legacy, legacy_time = measure(
+            LegacyPathologicalPartitioner, dataset, num_partitions
+        )
+        vectorized, vectorized_time = measure(
+            PathologicalPartitioner, dataset, num_partitions
+        )
+
+        print(
+            f"{num_rows} rows, {num_partitions} partitions, {num_classes} classes\n"
+            f"legacy: {legacy_time:.3f}s\n"
+            f"vectorized: {vectorized_time:.3f}s\n"
+            f"speedup: {legacy_time / vectorized_time:.1f}x\n"
+            f"same partitions: {same_partitions(legacy, vectorized, num_partitions)}"
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,78 @@
+import sys
+import os
+import resource
+import importlib
+import multiprocessing
+from dataclasses import replace
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(task_dir: str, client_id: int, memory_map_data: bool, queue) -> None:
+    os.chdir(task_dir)
+    sys.path.insert(0, task_dir)
+    task_cls = importlib.import_module("task").FLTask
+
+    class BenchmarkTask(task_cls):
+        def train_configs(self):
+            return replace(super().train_configs(), memory_map_data=memory_map_data)
+
+    task = BenchmarkTask()
+    baseline_rss = peak_rss_mb()
+    dataset, length = task.batch_dataset(task.train_dataset(client_id))
+
+    for _ in dataset:
+        pass
+
+    queue.put(
+        {
+            "memory_map_data": memory_map_data,
+            "dataset_length": length,
+            "baseline_peak_rss_mb": round(baseline_rss, 2),
+            "peak_rss_mb": round(peak_rss_mb(), 2),
+        }
+    )
+
+
+def run(task_dir: str, client_id: int, memory_map_data: bool) -> dict:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=measure, args=(task_dir, client_id, memory_map_data, queue)
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def validate_args(args: list[str]) -> tuple[str, int]:
+    if len(args) not in (2, 3):
+        raise ValueError("Usage: python peak_rss.py <path_to_task_dir> [client_id]")
+
+    task_dir = os.path.abspath(args[1])
+    if not os.path.isfile(os.path.join(task_dir, "task.py")):
+        raise FileNotFoundError(f"File not found: {os.path.join(task_dir, 'task.py')}")
+
+    return task_dir, int(args[2]) if len(args) == 3 else 0
+
+
+if __name__ == "__main__":
+    try:
+        task_dir, client_id = validate_args(sys.argv)
+        for memory_map_data in (False, True):
+            result = run(task_dir, client_id, memory_map_data)
+            print(
+                f"memory_map_data={result['memory_map_data']}: "
+                f"peak RSS {result['peak_rss_mb']} MB "
+                f"(after task setup: {result['baseline_peak_rss_mb']} MB, "
+                f"{result['dataset_length']} samples)"
+            )
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
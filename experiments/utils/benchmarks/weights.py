@@ -0,0 +1,94 @@
+import sys
+import time
+import tracemalloc
+from statistics import median
+
+from keras import layers, models, optimizers
+from flwr.common import ndarrays_to_parameters, parameters_to_ndarrays
+
+from netfl.core.models import cnn3
+from netfl.utils.weights import (
+    WeightsSerializer,
+    parameters_to_arrays,
+    set_model_weights,
+)
+
+
+def mlp(input_size: int, hidden_size: int, output_classes: int) -> models.Model:
+    model = models.Sequential(
+        [
+            layers.Input(shape=(input_size,)),
+            layers.Dense(hidden_size, activation="relu"),
+            layers.Dense(hidden_size, activation="relu"),
+            layers.Dense(output_classes, activation="softmax"),
+        ]
+    )
+    model.compile(
+        optimizer=optimizers.SGD(learning_rate=0.01),  # type: ignore[arg-type]
+        loss="sparse_categorical_crossentropy",
+    )
+    return model
+
+
+def measure(fn, repeats: int) -> tuple[float, float]:
+    fn()
+    times = []
+    peaks = []
+
+    for _ in range(repeats):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start_time)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return median(times) * 1000, median(peaks) / (1024**2)
+
+
+def benchmark(name: str, model: models.Model, repeats: int) -> None:
+    serializer = WeightsSerializer(model)
+    parameters = serializer.parameters()
+    num_params = model.count_params()
+
+    cases = {
+        "set (keras)": lambda: model.set_weights(parameters_to_ndarrays(parameters)),
+        "set (in place)": lambda: set_model_weights(
+            model, parameters_to_arrays(parameters)
+        ),
+        "get (keras)": lambda: ndarrays_to_parameters(model.get_weights()),
+        "get (serializer)": serializer.parameters,
+    }
+
+    print(f"{name}: {num_params} parameters ({num_params * 4 / (1024**2):.1f} MB)")
+    for case, fn in cases.items():
+        latency_ms, allocated_mb = measure(fn, repeats)
+        print(f"  {case}: {latency_ms:.2f} ms, {allocated_mb:.1f} MB allocated")
+
+
+def validate_args(args: list[str]) -> int:
+    if len(args) not in (1, 2):
+        raise ValueError("Usage: python weights.py [repeats]")
+
+    repeats = int(args[1]) if len(args) == 2 else 20
+    if repeats <= 0:
+        raise ValueError("The number of repeats must be positive.")
+
+    return repeats
+
+
+if __name__ == "__main__":
+    try:
+        repeats = validate_args(sys.argv)
+        benchmark(
+            "cnn3 (CIFAR-10)",
+            cnn3((32, 32, 3), 10, optimizers.SGD(learning_rate=0.01)),
+            repeats,
+        )
+        benchmark("mlp (3072-4096-4096-10)", mlp(3072, 4096, 10), repeats)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
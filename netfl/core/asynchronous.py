@@ -0,0 +1,245 @@
+import time
+import timeit
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+import numpy as np
+from flwr.common import Code, FitIns, FitRes, Metrics, Parameters, Scalar
+from flwr.server import Server as FlowerServer
+from flwr.server.client_manager import ClientManager
+from flwr.server.client_proxy import ClientProxy
+from flwr.server.history import History
+from flwr.server.server import fit_client
+
+from netfl.core.strategy import UpdateCodecStrategy
+from netfl.utils.log import log
+from netfl.utils.codecs import codec_from_tensor_type, parameters_size
+from netfl.utils.compression import (
+    Compressor,
+    compress_parameters,
+    decompress_parameters,
+)
+from netfl.utils.weights import arrays_to_parameters, parameters_to_arrays
+
+
+def staleness_weight(staleness: int, exponent: float) -> float:
+    return float((1 + staleness) ** -exponent)
+
+
+class AsyncServer(FlowerServer):
+    def __init__(
+        self,
+        client_manager: ClientManager,
+        strategy: UpdateCodecStrategy,
+        num_clients: int,
+        buffer_size: int,
+        staleness_exponent: float,
+        on_fit_config_fn: Callable[[int], dict[str, Scalar]],
+        fit_metrics_aggregation_fn: Callable[[list[tuple[int, Metrics]]], Metrics],
+        aggregate_metrics_fn: Callable[[dict[str, Scalar]], None],
+        compressor: Compressor | None = None,
+    ) -> None:
+        super().__init__(client_manager=client_manager, strategy=strategy)
+        self._codec_strategy = strategy
+        self._num_clients = num_clients
+        self._buffer_size = buffer_size
+        self._staleness_exponent = staleness_exponent
+        self._on_fit_config_fn = on_fit_config_fn
+        self._fit_metrics_aggregation_fn = fit_metrics_aggregation_fn
+        self._aggregate_metrics_fn = aggregate_metrics_fn
+        self._compressor = compressor
+        self._version = 0
+        self._global_versions: dict[int, list[np.ndarray]] = {}
+        self._broadcasts: dict[int, Parameters] = {}
+
+    def fit(self, num_rounds: int, timeout: float | None) -> tuple[History, float]:
+        history = History()
+        self.parameters = self._get_initial_parameters(server_round=0, timeout=timeout)
+        self._global_versions = {0: parameters_to_arrays(self.parameters)}
+        self._evaluate(0, history, 0.0)
+
+        self._client_manager.wait_for(self._num_clients)
+        start_time = timeit.default_timer()
+        pending: dict[Future, tuple[ClientProxy, int]] = {}
+
+        with ThreadPoolExecutor(max_workers=self._num_clients) as executor:
+
+            def submit(client: ClientProxy) -> None:
+                future = executor.submit(
+                    fit_client, client, self._fit_ins(), timeout, self._version + 1
+                )
+                pending[future] = (client, self._version)
+
+            for client in self._client_manager.all().values():
+                submit(client)
+
+            sums = self._zeros()
+            buffer: list[tuple[int, Metrics]] = []
+            update_bytes = 0
+            aggregate_time = 0.0
+
+            while pending and self._version < num_rounds:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    client, base_version = pending.pop(future)
+                    failure = future.exception()
+                    if failure is not None:
+                        log(f"Client {client.cid} failed and was dropped: {failure}")
+                        continue
+
+                    _, fit_res = future.result()
+                    if fit_res.status.code != Code.OK:
+                        log(f"Client {client.cid} failed: {fit_res.status.message}")
+                        continue
+
+                    start_aggregate_time = time.perf_counter()
+                    staleness = self._version - base_version
+                    weight = staleness_weight(staleness, self._staleness_exponent)
+                    self._accumulate(sums, fit_res, base_version, weight)
+                    update_bytes += parameters_size(fit_res.parameters)
+                    aggregate_time += time.perf_counter() - start_aggregate_time
+
+                    buffer.append(
+                        (
+                            fit_res.num_examples,
+                            {
+                                **fit_res.metrics,
+                                "base_version": base_version,
+                                "staleness": staleness,
+                                "staleness_weight": weight,
+                            },
+                        )
+                    )
+
+                    if len(buffer) >= self._buffer_size:
+                        start_aggregate_time = time.perf_counter()
+                        self._apply(sums, sum(n for n, _ in buffer), client)
+                        aggregate_time += time.perf_counter() - start_aggregate_time
+
+                        self._record_round(
+                            buffer, update_bytes, aggregate_time, history, start_time
+                        )
+                        sums = self._zeros()
+                        buffer, update_bytes, aggregate_time = [], 0, 0.0
+
+                    if self._version < num_rounds:
+                        submit(client)
+
+                self._prune_versions({version for _, version in pending.values()})
+
+            if pending:
+                log(f"Waiting for {len(pending)} outstanding updates to be discarded")
+
+        return history, timeit.default_timer() - start_time
+
+    def _fit_ins(self) -> FitIns:
+        if self._version not in self._broadcasts:
+            parameters = self.parameters
+            if self._compressor is not None:
+                parameters = compress_parameters(parameters, self._compressor)
+            self._broadcasts = {self._version: parameters}
+
+        return FitIns(
+            parameters=self._broadcasts[self._version],
+            config={
+                **self._on_fit_config_fn(self._version + 1),
+                **self._codec_strategy.fit_config(),
+            },
+        )
+
+    def _zeros(self) -> list[np.ndarray]:
+        return [
+            np.zeros(weight.shape, dtype=np.float32)
+            for weight in self._global_versions[self._version]
+        ]
+
+    def _accumulate(
+        self,
+        sums: list[np.ndarray],
+        fit_res: FitRes,
+        base_version: int,
+        weight: float,
+    ) -> None:
+        parameters = decompress_parameters(fit_res.parameters)
+        codec = codec_from_tensor_type(parameters.tensor_type)
+        arrays = (
+            codec.decode(parameters)
+            if codec is not None
+            else parameters_to_arrays(parameters)
+        )
+        coefficient = weight * fit_res.num_examples
+
+        if codec is not None and codec.delta:
+            for total, delta in zip(sums, arrays):
+                total += coefficient * delta
+        else:
+            for total, array, base in zip(
+                sums, arrays, self._global_versions[base_version]
+            ):
+                total += coefficient * (array - base)
+
+    def _apply(
+        self, sums: list[np.ndarray], num_examples: int, client: ClientProxy
+    ) -> None:
+        weights = [
+            (weight + total / num_examples).astype(weight.dtype, copy=False)
+            for weight, total in zip(self._global_versions[self._version], sums)
+        ]
+        parameters = self._codec_strategy.aggregate_buffer(
+            self._version + 1, client, weights, num_examples
+        )
+        if parameters is not None:
+            weights = parameters_to_arrays(parameters)
+
+        self._version += 1
+        self._global_versions[self._version] = weights
+        self.parameters = arrays_to_parameters(weights)
+
+    def _prune_versions(self, versions: set[int]) -> None:
+        self._global_versions = {
+            version: weights
+            for version, weights in self._global_versions.items()
+            if version == self._version or version in versions
+        }
+
+    def _record_round(
+        self,
+        buffer: list[tuple[int, Metrics]],
+        update_bytes: int,
+        aggregate_time: float,
+        history: History,
+        start_time: float,
+    ) -> None:
+        staleness = [metrics["staleness"] for _, metrics in buffer]
+        log(
+            f"[ROUND {self._version}] aggregated {len(buffer)} buffered updates, "
+            f"staleness {min(staleness)}-{max(staleness)}"
+        )
+
+        history.add_metrics_distributed_fit(
+            server_round=self._version,
+            metrics=self._fit_metrics_aggregation_fn(buffer),
+        )
+        self._aggregate_metrics_fn(
+            {
+                "round": self._version,
+                "mode": "async",
+                "num_results": len(buffer),
+                "update_bytes": update_bytes,
+                "aggregate_time": aggregate_time,
+                "staleness_avg": float(np.mean(staleness)),
+                "staleness_max": max(staleness),
+            }
+        )
+        self._evaluate(self._version, history, timeit.default_timer() - start_time)
+
+    def _evaluate(self, server_round: int, history: History, elapsed: float) -> None:
+        res = self.strategy.evaluate(server_round, parameters=self.parameters)
+        if res is None:
+            return
+
+        loss, metrics = res
+        log(f"fit progress: ({server_round}, {loss}, {metrics}, {elapsed})")
+        history.add_loss_centralized(server_round=server_round, loss=loss)
+        history.add_metrics_centralized(server_round=server_round, metrics=metrics)
@@ -2,15 +2,46 @@ import time
 import json
 from datetime import datetime
 
-from flwr.client import NumPyClient, start_client
-from flwr.common import NDArrays, Scalar
+import numpy as np
+
+from flwr.client import Client as FlowerClient, start_client
+from flwr.common import (
+    Code,
+    FitIns,
+    FitRes,
+    GetParametersIns,
+    GetParametersRes,
+    Parameters,
+    Scalar,
+    Status,
+)
 
 from netfl.core.task import Task
 from netfl.utils.log import log
-from netfl.utils.metrics import ResourceSampler
+from netfl.utils.dataset import shard_name
+from netfl.utils.metrics import ResourceSampler, EpochSampler
+from netfl.utils.compression import (
+    compress_parameters,
+    decompress_parameters,
+    get_compressor,
+)
+from netfl.utils.codecs import (
+    MISSING_BASE_VERSION,
+    RawCodec,
+    arrays_size,
+    get_codec,
+    parameters_size,
+    relative_error,
+    xor_arrays,
+)
+from netfl.utils.weights import (
+    WeightsSerializer,
+    parameters_to_arrays,
+    set_model_weights,
+)
 
 
-class Client(NumPyClient):
+class Client(FlowerClient):
     def __init__(
         self,
         client_id: int,
@@ -20,13 +51,38 @@ class Client(NumPyClient):
         self._client_id = client_id
         self._client_name = client_name
         self._dataset, self._dataset_length = task.batch_dataset(
-            task.train_dataset(client_id)
+            task.train_dataset(client_id),
+            cache_name=shard_name(client_id),
+            client_id=client_id,
         )
-        self._model = task.model()
+        self._model = task.build_model()
+        self._weights_serializer = WeightsSerializer(self._model)
         self._train_configs = task.train_configs()
+        self._update_codec = (
+            get_codec(
+                self._train_configs.update_codec or RawCodec.name,
+                self._train_configs.update_topk_ratio,
+                self._train_configs.update_delta,
+            )
+            if self._train_configs.update_codec is not None
+            or self._train_configs.update_delta
+            else None
+        )
+        self._compressor = (
+            get_compressor(
+                self._train_configs.parameters_compression,
+                self._train_configs.parameters_compression_level,
+            )
+            if self._train_configs.parameters_compression is not None
+            else None
+        )
+        self._global_weights: list[np.ndarray] = []
+        self._global_version: int | None = None
+        self._residual: list[np.ndarray] | None = None
         self._receive_time = 0.0
         self._previous_send_time = 0.0
         self._resource_sampler = ResourceSampler()
+        self._epoch_sampler = EpochSampler()
 
         task.print_configs(self._model)
 
@@ -41,6 +97,9 @@ class Client(NumPyClient):
         train_time: float,
         cpu_avg_percent: float,
         memory_avg_mb: float,
+        first_batch_time_avg: float,
+        rss_max_mb: float,
+        update_metrics: dict[str, Scalar],
         update_exchange_time: float | None,
     ) -> dict[str, Scalar]:
         metrics = {
@@ -49,8 +108,12 @@ class Client(NumPyClient):
             "round": round,
             "dataset_length": dataset_length,
             "train_time": train_time,
+            "precision_policy": self._model.dtype_policy.name,
             "cpu_avg_percent": cpu_avg_percent,
             "memory_avg_mb": memory_avg_mb,
+            "first_batch_time_avg": first_batch_time_avg,
+            "rss_max_mb": rss_max_mb,
+            **update_metrics,
             "timestamp": datetime.now().isoformat(),
         }
 
@@ -59,23 +122,46 @@ class Client(NumPyClient):
 
         return metrics
 
-    def fit(
-        self, parameters: NDArrays, configs: dict[str, Scalar]
-    ) -> tuple[NDArrays, int, dict[str, Scalar]]:
+    def get_parameters(self, ins: GetParametersIns) -> GetParametersRes:
+        return GetParametersRes(
+            status=Status(code=Code.OK, message="Success"),
+            parameters=self._weights_serializer.parameters(),
+        )
+
+    def fit(self, ins: FitIns) -> FitRes:
         self._receive_time = time.perf_counter()
-        self._model.set_weights(parameters)
+        start_decode_time = time.perf_counter()
+        global_weights = self.decode_broadcast(ins)
+        broadcast_decode_time = time.perf_counter() - start_decode_time
+
+        if global_weights is None:
+            return FitRes(
+                status=Status(
+                    code=Code.OK,
+                    message="Missing base version, the full model is required.",
+                ),
+                parameters=Parameters(tensors=[], tensor_type=""),
+                num_examples=0,
+                metrics={**self.broadcast_metrics(ins), MISSING_BASE_VERSION: True},
+            )
+
+        self._global_weights = global_weights
+        set_model_weights(self._model, self._global_weights)
         self._resource_sampler.start()
+        self._epoch_sampler.reset()
         start_train_time = time.perf_counter()
 
         self._model.fit(
             self._dataset,
             epochs=self._train_configs.epochs,
             verbose="2",
+            callbacks=[self._epoch_sampler],
         )
 
         train_time = time.perf_counter() - start_train_time
         cpu_avg_percent, memory_avg_mb = self._resource_sampler.stop()
-        weights = self._model.get_weights()
+        first_batch_time_avg, rss_max_mb = self._epoch_sampler.summary()
+        parameters, update_metrics = self.encode_update()
         update_exchange_time = None
 
         current_send_time = time.perf_counter()
@@ -84,21 +170,104 @@ class Client(NumPyClient):
         self._previous_send_time = current_send_time
 
         metrics = self.train_metrics(
-            configs["round"],
+            ins.config["round"],
             self._dataset_length,
             train_time,
             cpu_avg_percent,
             memory_avg_mb,
+            first_batch_time_avg,
+            rss_max_mb,
+            {
+                **update_metrics,
+                **self.broadcast_metrics(ins),
+                "broadcast_decode_time": broadcast_decode_time,
+            },
             update_exchange_time,
         )
         self.print_metrics(metrics)
 
-        return (
-            weights,
-            self._dataset_length,
-            metrics,
+        return FitRes(
+            status=Status(code=Code.OK, message="Success"),
+            parameters=parameters,
+            num_examples=self._dataset_length,
+            metrics=metrics,
         )
 
+    def decode_broadcast(self, ins: FitIns) -> list[np.ndarray] | None:
+        arrays = parameters_to_arrays(decompress_parameters(ins.parameters))
+
+        if "base_version" in ins.config:
+            if ins.config["base_version"] != self._global_version:
+                log(
+                    f"Received a delta against global version "
+                    f"{ins.config['base_version']}, but the client holds version "
+                    f"{self._global_version}; requesting the full model"
+                )
+                self._global_version = None
+                return None
+            arrays = xor_arrays(arrays, self._global_weights)
+
+        global_version = ins.config.get("global_version")
+        self._global_version = (
+            global_version if isinstance(global_version, int) else None
+        )
+
+        return arrays
+
+    def broadcast_metrics(self, ins: FitIns) -> dict[str, Scalar]:
+        metrics: dict[str, Scalar] = {
+            "downlink_bytes": parameters_size(ins.parameters),
+            "downlink_delta": "base_version" in ins.config,
+        }
+        if self._global_version is not None:
+            metrics["global_version"] = self._global_version
+        return metrics
+
+    def encode_update(self) -> tuple[Parameters, dict[str, Scalar]]:
+        start_encode_time = time.perf_counter()
+
+        if self._update_codec is None:
+            parameters = self._weights_serializer.parameters()
+            update_metrics: dict[str, Scalar] = {}
+        else:
+            weights = self._weights_serializer.arrays()
+            update = self.update_delta(weights) if self._update_codec.delta else weights
+
+            parameters = self._update_codec.encode(update)
+            decoded = self._update_codec.decode(parameters)
+            if self._update_codec.delta:
+                self._residual = [delta - sent for delta, sent in zip(update, decoded)]
+
+            update_metrics = {
+                "update_codec": self._update_codec.name,
+                "update_delta": self._update_codec.delta,
+                "update_error": relative_error(update, decoded, weights),
+            }
+
+        if self._compressor is not None:
+            parameters = compress_parameters(parameters, self._compressor)
+            update_metrics["parameters_compression"] = self._compressor.name
+
+        update_metrics["update_encode_time"] = time.perf_counter() - start_encode_time
+        update_metrics["update_bytes"] = parameters_size(parameters)
+        update_metrics["update_compression_ratio"] = (
+            arrays_size(self._global_weights) / update_metrics["update_bytes"]
+        )
+
+        return parameters, update_metrics
+
+    def update_delta(self, weights: list[np.ndarray]) -> list[np.ndarray]:
+        deltas = [
+            weight - global_weight
+            for weight, global_weight in zip(weights, self._global_weights)
+        ]
+
+        if self._residual is not None:
+            for delta, residual in zip(deltas, self._residual):
+                delta += residual
+
+        return deltas
+
     def print_metrics(self, metrics: dict[str, Scalar]) -> None:
         log(f"[ROUND {metrics['round']}]")
         log(f"[METRICS]\n{json.dumps(metrics, indent=2, default=str)}")
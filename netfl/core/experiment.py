@@ -1,3 +1,4 @@
+import os
 from typing import Any
 from dataclasses import replace
 
@@ -61,6 +62,16 @@ class FLExperiment(FogbedDistributedExperiment):
 
         return environment
 
+    def _dataset_volumes(self) -> list[str]:
+        local_path = self._task._dataset_info.local_path
+        if local_path is None:
+            return []
+
+        host_path = os.path.join(self._task_dir, local_path)
+        container_path = os.path.join("/app", local_path)
+
+        return [f"{os.path.abspath(host_path)}:{container_path}:ro"]
+
     def create_cluster(self, resource: ClusterResource) -> VirtualInstance:
         virtual_instance = self.add_virtual_instance(
             name=resource.name,
@@ -88,6 +99,7 @@ class FLExperiment(FogbedDistributedExperiment):
             volumes=[
                 f"{self._task_dir}/task.py:/app/task.py",
                 f"{self._task_dir}/logs:/app/logs",
+                *self._dataset_volumes(),
             ],
             resources=HardwareResources(
                 cu=resource.compute_units, mu=resource.memory_units
@@ -123,6 +135,7 @@ class FLExperiment(FogbedDistributedExperiment):
                 f"--server_port={self._server_port} "
             ),
             environment=self._environment(),
+            volumes=self._dataset_volumes(),
             resources=HardwareResources(
                 cu=resource.compute_units, mu=resource.memory_units
             ),
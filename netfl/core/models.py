@@ -15,7 +15,7 @@ def cnn3(
             layers.MaxPooling2D(pool_size=(2, 2)),
             layers.Flatten(),
             layers.Dense(512, activation="relu"),
-            layers.Dense(output_classes, activation="softmax"),
+            layers.Dense(output_classes, activation="softmax", dtype="float32"),
         ]
     )
 
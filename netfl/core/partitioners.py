@@ -4,6 +4,10 @@ from flwr_datasets import partitioner
 
 from netfl.core.task import DatasetInfo, DatasetPartitioner, TrainConfigs
 from netfl.external import partitioners
+from netfl.utils.partitions import (
+    NativeDirichletPartitioner,
+    NativeQuantitySkewPartitioner,
+)
 
 
 class IidPartitioner(DatasetPartitioner):
@@ -28,6 +32,7 @@ class DirichletPartitioner(DatasetPartitioner):
         alpha: float,
         min_partition_size: int = 0,
         self_balancing: bool = True,
+        native: bool = False,
     ):
         if alpha <= 0:
             raise ValueError(f"alpha must be positive, got {alpha}")
@@ -39,6 +44,7 @@ class DirichletPartitioner(DatasetPartitioner):
         self.alpha = alpha
         self.min_partition_size = min_partition_size
         self.self_balancing = self_balancing
+        self.native = native
 
     def partitioner(
         self,
@@ -50,12 +56,24 @@ class DirichletPartitioner(DatasetPartitioner):
             "alpha": self.alpha,
             "min_partition_size": self.min_partition_size,
             "self_balancing": self.self_balancing,
+            "native": self.native,
             "partition_by": dataset_info.label_key,
             "num_partitions": train_configs.num_partitions,
             "seed_data": train_configs.seed_data,
             "shuffle_data": train_configs.shuffle_data,
         }
 
+        if self.native:
+            return configs, NativeDirichletPartitioner(
+                alpha=self.alpha,
+                min_partition_size=self.min_partition_size,
+                self_balancing=self.self_balancing,
+                partition_by=dataset_info.label_key,
+                num_partitions=train_configs.num_partitions,
+                seed=train_configs.seed_data,
+                shuffle=train_configs.shuffle_data,
+            )
+
         return configs, partitioner.DirichletPartitioner(
             alpha=self.alpha,
             min_partition_size=self.min_partition_size,
@@ -113,3 +131,86 @@ class PathologicalPartitioner(DatasetPartitioner):
             seed=train_configs.seed_data,
             shuffle=train_configs.shuffle_data,
         )
+
+
+class QuantitySkewPartitioner(DatasetPartitioner):
+    def __init__(
+        self,
+        size_distribution: Literal["power_law", "lognormal"] = "power_law",
+        size_param: float = 1.5,
+        size_weights: list[float] | None = None,
+        label_alpha: float | None = None,
+        min_partition_size: int = 1,
+    ):
+        valid_distributions = {"power_law", "lognormal"}
+        if size_distribution not in valid_distributions:
+            raise ValueError(
+                f"Invalid size_distribution: {size_distribution}. "
+                f"Must be one of {valid_distributions}"
+            )
+        if size_param <= 0:
+            raise ValueError(f"size_param must be positive, got {size_param}")
+        if size_weights is not None and any(w < 0 for w in size_weights):
+            raise ValueError("size_weights must be non-negative")
+        if label_alpha is not None and label_alpha <= 0:
+            raise ValueError(f"label_alpha must be positive, got {label_alpha}")
+        if min_partition_size < 0:
+            raise ValueError(
+                f"min_partition_size must be non-negative, got {min_partition_size}"
+            )
+
+        self.size_distribution = size_distribution
+        self.size_param = size_param
+        self.size_weights = size_weights
+        self.label_alpha = label_alpha
+        self.min_partition_size = min_partition_size
+
+    @classmethod
+    def from_compute_units(
+        cls,
+        compute_units: list[float],
+        label_alpha: float | None = None,
+        min_partition_size: int = 1,
+    ) -> "QuantitySkewPartitioner":
+        if not compute_units or any(units <= 0 for units in compute_units):
+            raise ValueError(
+                "compute_units must be a non-empty list of positive values"
+            )
+
+        return cls(
+            size_weights=[float(units) for units in compute_units],
+            label_alpha=label_alpha,
+            min_partition_size=min_partition_size,
+        )
+
+    def partitioner(
+        self,
+        dataset_info: DatasetInfo,
+        train_configs: TrainConfigs,
+    ) -> tuple[dict[str, Any], partitioner.Partitioner]:
+        configs = {
+            "name": self.__class__.__name__,
+            "size_distribution": (
+                "weights" if self.size_weights is not None else self.size_distribution
+            ),
+            "size_param": self.size_param,
+            "size_weights": self.size_weights,
+            "label_alpha": self.label_alpha,
+            "min_partition_size": self.min_partition_size,
+            "partition_by": dataset_info.label_key,
+            "num_partitions": train_configs.num_partitions,
+            "seed_data": train_configs.seed_data,
+            "shuffle_data": train_configs.shuffle_data,
+        }
+
+        return configs, NativeQuantitySkewPartitioner(
+            size_distribution=self.size_distribution,  # type: ignore[arg-type]
+            size_param=self.size_param,
+            size_weights=self.size_weights,
+            label_alpha=self.label_alpha,
+            min_partition_size=self.min_partition_size,
+            partition_by=dataset_info.label_key,
+            num_partitions=train_configs.num_partitions,
+            seed=train_configs.seed_data,
+            shuffle=train_configs.shuffle_data,
+        )
@@ -0,0 +1,173 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import numpy as np
+from flwr.common import Metrics
+from flwr.server import SimpleClientManager
+from flwr.server.client_proxy import ClientProxy
+from flwr.server.criterion import Criterion
+
+from netfl.utils.log import log
+
+
+STATS_SMOOTHING = 0.5
+
+
+@dataclass
+class ClientStats:
+    round: int
+    num_examples: int
+    train_time: float | None = None
+    update_exchange_time: float | None = None
+
+
+def smooth(previous: float | None, value: float) -> float:
+    if previous is None:
+        return value
+    return STATS_SMOOTHING * value + (1 - STATS_SMOOTHING) * previous
+
+
+class ClientSelector(ABC):
+    name: str
+
+    @abstractmethod
+    def score(self, stats: ClientStats) -> float | None:
+        pass
+
+    def weights(self, stats: list[ClientStats | None]) -> np.ndarray | None:
+        scores = [self.score(s) if s is not None else None for s in stats]
+        known = [score for score in scores if score is not None]
+        if not known:
+            return None
+
+        weights = np.array(
+            [score if score is not None else max(known) for score in scores],
+            dtype=np.float64,
+        )
+        return weights / weights.sum()
+
+
+class UniformSelector(ClientSelector):
+    name = "uniform"
+
+    def score(self, stats: ClientStats) -> float | None:
+        return None
+
+
+class DatasetSizeSelector(ClientSelector):
+    name = "dataset_size"
+
+    def score(self, stats: ClientStats) -> float | None:
+        return float(max(stats.num_examples, 1))
+
+
+class SpeedSelector(ClientSelector):
+    name = "speed"
+
+    def score(self, stats: ClientStats) -> float | None:
+        if stats.train_time is None:
+            return None
+        return 1 / max(stats.train_time, 1e-3)
+
+
+class BandwidthSelector(ClientSelector):
+    name = "bandwidth"
+
+    def score(self, stats: ClientStats) -> float | None:
+        if stats.update_exchange_time is None:
+            return None
+        return 1 / max(stats.update_exchange_time, 1e-3)
+
+
+SELECTORS: dict[str, type[ClientSelector]] = {
+    selector.name: selector
+    for selector in (
+        UniformSelector,
+        DatasetSizeSelector,
+        SpeedSelector,
+        BandwidthSelector,
+    )
+}
+
+
+def validate_client_selection(name: str) -> None:
+    if name not in SELECTORS:
+        raise ValueError(
+            f"Unsupported client_selection: {name}. Supported: {', '.join(SELECTORS)}."
+        )
+
+
+def get_selector(name: str) -> ClientSelector:
+    validate_client_selection(name)
+    return SELECTORS[name]()
+
+
+class SelectionClientManager(SimpleClientManager):
+    def __init__(self, selector: ClientSelector, seed: int) -> None:
+        super().__init__()
+        self._selector = selector
+        self._rng = np.random.default_rng(seed)
+        self._stats: dict[str, ClientStats] = {}
+
+    def unregister(self, client: ClientProxy) -> None:
+        super().unregister(client)
+        self._stats.pop(client.cid, None)
+
+    def record(self, results: list[tuple[ClientProxy, int, Metrics]]) -> None:
+        for client, num_examples, metrics in results:
+            round = metrics.get("round")
+            previous = self._stats.get(client.cid)
+            stats = ClientStats(
+                round=round if isinstance(round, int) else 0,
+                num_examples=num_examples,
+            )
+
+            train_time = metrics.get("train_time")
+            if isinstance(train_time, (int, float)):
+                stats.train_time = smooth(
+                    previous.train_time if previous is not None else None,
+                    float(train_time),
+                )
+
+            update_exchange_time = metrics.get("update_exchange_time")
+            if previous is not None:
+                stats.update_exchange_time = previous.update_exchange_time
+                if (
+                    isinstance(update_exchange_time, (int, float))
+                    and stats.round == previous.round + 1
+                ):
+                    stats.update_exchange_time = smooth(
+                        previous.update_exchange_time, float(update_exchange_time)
+                    )
+
+            self._stats[client.cid] = stats
+
+    def sample(
+        self,
+        num_clients: int,
+        min_num_clients: int | None = None,
+        criterion: Criterion | None = None,
+    ) -> list[ClientProxy]:
+        if min_num_clients is None:
+            min_num_clients = num_clients
+        self.wait_for(min_num_clients)
+
+        available = [
+            cid
+            for cid, client in self.clients.items()
+            if criterion is None or criterion.select(client)
+        ]
+        if num_clients > len(available):
+            log(
+                f"Sampling failed: {len(available)} clients available, "
+                f"{num_clients} requested"
+            )
+            return []
+
+        weights = self._selector.weights([self._stats.get(cid) for cid in available])
+        return [
+            self.clients[available[index]]
+            for index in self._rng.choice(
+                len(available), size=num_clients, replace=False, p=weights
+            )
+        ]
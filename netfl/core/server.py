@@ -1,21 +1,49 @@
 import json
 from datetime import datetime
 
-from flwr.server import ServerConfig, start_server
-from flwr.common import ndarrays_to_parameters, NDArrays, Metrics, Scalar
+from flwr.server import Server as FlowerServer, ServerConfig, start_server
+from flwr.common import NDArrays, Metrics, Scalar
 
 from netfl.core.task import Task
+from netfl.core.strategy import UpdateCodecStrategy
+from netfl.core.streaming import StreamingServer
+from netfl.core.asynchronous import AsyncServer
+from netfl.core.selection import SelectionClientManager, get_selector
 from netfl.utils.log import log
+from netfl.utils.compression import Compressor, get_compressor
+from netfl.utils.flat import FlatLayout
+from netfl.utils.weights import WeightsSerializer, set_model_weights
 
 
 class Server:
     def __init__(self, task: Task) -> None:
-        self._dataset, self._dataset_length = task.batch_dataset(task.test_dataset())
-        self._model = task.model()
-        self._strategy = task.aggregation_strategy()
         self._train_configs = task.train_configs()
+        test_dataset = task.test_dataset()
+        self._dataset, self._dataset_length = task.batch_dataset(
+            test_dataset,
+            training=False,
+            cache_name="test",
+            batch_size=self._train_configs.evaluate_batch_size,
+        )
+        self._subsample_dataset = None
+        self._subsample_dataset_length = 0
+
+        if self._train_configs.evaluate_subsample_size is not None:
+            subsample_size = self._train_configs.evaluate_subsample_size
+            self._subsample_dataset, self._subsample_dataset_length = (
+                task.batch_dataset(
+                    task.subsample_dataset(test_dataset, subsample_size),
+                    training=False,
+                    cache_name=f"test_subsample_{subsample_size}",
+                    batch_size=self._train_configs.evaluate_batch_size,
+                )
+            )
+
+        self._model = task.build_model()
+        self._strategy = task.aggregation_strategy()
         self._train_metrics = []
         self._evaluate_metrics = []
+        self._aggregate_metrics = []
 
         task.print_configs(self._model)
 
@@ -30,22 +58,43 @@ class Server:
         self._train_metrics.extend(train_metrics)
         return {}
 
+    def aggregate_metrics(self, metrics: dict[str, Scalar]) -> None:
+        self._aggregate_metrics.append(
+            {**metrics, "timestamp": datetime.now().isoformat()}
+        )
+
     def evaluate(
         self, round: int, parameters: NDArrays, configs: dict[str, Scalar]
-    ) -> tuple[float, dict[str, Scalar]]:
-        self._model.set_weights(parameters)
+    ) -> tuple[float, dict[str, Scalar]] | None:
+        if (
+            round % self._train_configs.evaluate_every == 0
+            or round == self._train_configs.num_rounds
+        ):
+            mode = "full"
+            dataset, dataset_length = self._dataset, self._dataset_length
+        elif self._subsample_dataset is not None:
+            mode = "subsample"
+            dataset, dataset_length = (
+                self._subsample_dataset,
+                self._subsample_dataset_length,
+            )
+        else:
+            return None
+
+        set_model_weights(self._model, parameters)
 
         loss, accuracy = self._model.evaluate(
-            self._dataset,
+            dataset,
             verbose="2",
         )
 
         self._evaluate_metrics.append(
             {
                 "round": round,
+                "mode": mode,
                 "loss": loss,
                 "accuracy": accuracy,
-                "dataset_length": self._dataset_length,
+                "dataset_length": dataset_length,
                 "timestamp": datetime.now().isoformat(),
             }
         )
@@ -59,29 +108,98 @@ class Server:
         metrics = {
             "train": self._train_metrics,
             "evaluate": self._evaluate_metrics,
+            "aggregate": self._aggregate_metrics,
         }
         log(f"[METRICS]\n{json.dumps(metrics, indent=2, default=str)}")
 
+    def clients_per_round(self, fraction_fit: float | None = None) -> int:
+        if self._train_configs.clients_per_round is not None:
+            return self._train_configs.clients_per_round
+
+        if self._train_configs.fraction_fit is not None:
+            fraction_fit = self._train_configs.fraction_fit
+
+        if fraction_fit is not None:
+            return max(1, int(self._train_configs.num_clients * fraction_fit))
+
+        return self._train_configs.num_clients
+
+    def flower_server(
+        self,
+        client_manager: SelectionClientManager,
+        strategy: UpdateCodecStrategy,
+        compressor: Compressor | None,
+    ) -> FlowerServer | None:
+        if self._train_configs.async_buffer_size is not None:
+            return AsyncServer(
+                client_manager=client_manager,
+                strategy=strategy,
+                num_clients=self._train_configs.num_clients,
+                buffer_size=self._train_configs.async_buffer_size,
+                staleness_exponent=self._train_configs.async_staleness_exponent,
+                on_fit_config_fn=self.train_configs,
+                fit_metrics_aggregation_fn=self.train_metrics,
+                aggregate_metrics_fn=self.aggregate_metrics,
+                compressor=compressor,
+            )
+
+        if self._train_configs.streaming_aggregation:
+            return StreamingServer(client_manager=client_manager, strategy=strategy)
+
+        return None
+
     def start(self, server_port: int) -> None:
         strategy_type, strategy_args = self._strategy
-        initial_parameters = ndarrays_to_parameters(self._model.get_weights())
-
-        strategy = strategy_type(
+        initial_parameters = WeightsSerializer(self._model).parameters()
+        compressor = (
+            get_compressor(
+                self._train_configs.parameters_compression,
+                self._train_configs.parameters_compression_level,
+            )
+            if self._train_configs.parameters_compression is not None
+            else None
+        )
+        client_manager = SelectionClientManager(
+            get_selector(self._train_configs.client_selection),
+            self._train_configs.seed_data,
+        )
+        clients_per_round = self.clients_per_round(strategy_args.get("fraction_fit"))
+        strategy_args = {
             **strategy_args,
-            on_fit_config_fn=self.train_configs,  # type: ignore[arg-type]
-            fit_metrics_aggregation_fn=self.train_metrics,  # type: ignore[arg-type]
-            fraction_evaluate=0,  # type: ignore[arg-type]
-            initial_parameters=initial_parameters,  # type: ignore[arg-type]
-            min_fit_clients=self._train_configs.num_clients,  # type: ignore[arg-type]
-            min_evaluate_clients=self._train_configs.num_clients,  # type: ignore[arg-type]
-            min_available_clients=self._train_configs.num_clients,  # type: ignore[arg-type]
-            evaluate_fn=self.evaluate,  # type: ignore[arg-type]
+            "fraction_fit": clients_per_round / self._train_configs.num_clients,
+            "min_fit_clients": clients_per_round,
+        }
+
+        strategy = UpdateCodecStrategy(
+            strategy_type(
+                **strategy_args,
+                on_fit_config_fn=self.train_configs,  # type: ignore[arg-type]
+                fit_metrics_aggregation_fn=self.train_metrics,  # type: ignore[arg-type]
+                fraction_evaluate=0,  # type: ignore[arg-type]
+                initial_parameters=initial_parameters,  # type: ignore[arg-type]
+                min_evaluate_clients=self._train_configs.num_clients,  # type: ignore[arg-type]
+                min_available_clients=self._train_configs.num_clients,  # type: ignore[arg-type]
+                evaluate_fn=self.evaluate,  # type: ignore[arg-type]
+            ),
+            aggregate_metrics_fn=self.aggregate_metrics,
+            compressor=compressor,
+            downlink_delta=self._train_configs.downlink_delta,
+            flat_layout=(
+                FlatLayout.from_model(self._model)
+                if self._train_configs.flat_aggregation
+                else None
+            ),
+            flat_batch_size=self._train_configs.flat_aggregation_batch_size,
+            flat_threads=self._train_configs.flat_aggregation_threads,
+            fit_results_fn=client_manager.record,
         )
 
         start_server(
             config=ServerConfig(num_rounds=self._train_configs.num_rounds),
             server_address=f"0.0.0.0:{server_port}",
+            server=self.flower_server(client_manager, strategy, compressor),
             strategy=strategy,
+            client_manager=client_manager,
         )
 
         self.print_metrics()
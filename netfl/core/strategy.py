@@ -0,0 +1,615 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+from flwr.common import (
+    Code,
+    EvaluateIns,
+    EvaluateRes,
+    FitIns,
+    FitRes,
+    Metrics,
+    Parameters,
+    Scalar,
+    Status,
+)
+from flwr.server.client_manager import ClientManager
+from flwr.server.client_proxy import ClientProxy
+from flwr.server.server import FitResultsAndFailures, fit_clients
+from flwr.server.strategy import (
+    FedAdagrad,
+    FedAdam,
+    FedAvg,
+    FedAvgM,
+    FedProx,
+    FedYogi,
+    Strategy,
+)
+
+from netfl.utils.log import log
+from netfl.utils.compression import (
+    Compressor,
+    compress_parameters,
+    decompress_parameters,
+)
+from netfl.utils.codecs import (
+    MISSING_BASE_VERSION,
+    codec_from_tensor_type,
+    parameters_size,
+    xor_arrays,
+)
+from netfl.utils.flat import FlatLayout
+from netfl.utils.weights import (
+    TENSOR_TYPE,
+    arrays_to_parameters,
+    parameters_to_arrays,
+)
+
+
+WEIGHTED_MEAN_STRATEGIES = (FedAvg, FedProx, FedAvgM, FedAdam, FedAdagrad, FedYogi)
+FLAT_CHUNK_SIZE = 1 << 15
+
+
+def discard_metrics(metrics: list[tuple[int, Metrics]]) -> Metrics:
+    return {}
+
+
+class StrategyWrapper(Strategy):
+    def __init__(self, strategy: Strategy) -> None:
+        self._strategy = strategy
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._strategy!r})"
+
+    def initialize_parameters(self, client_manager: ClientManager) -> Parameters | None:
+        return self._strategy.initialize_parameters(client_manager)
+
+    def configure_fit(
+        self, server_round: int, parameters: Parameters, client_manager: ClientManager
+    ) -> list[tuple[ClientProxy, FitIns]]:
+        return self._strategy.configure_fit(server_round, parameters, client_manager)
+
+    def aggregate_fit(
+        self,
+        server_round: int,
+        results: list[tuple[ClientProxy, FitRes]],
+        failures: list[tuple[ClientProxy, FitRes] | BaseException],
+    ) -> tuple[Parameters | None, dict[str, Scalar]]:
+        return self._strategy.aggregate_fit(server_round, results, failures)
+
+    def configure_evaluate(
+        self, server_round: int, parameters: Parameters, client_manager: ClientManager
+    ) -> list[tuple[ClientProxy, EvaluateIns]]:
+        return self._strategy.configure_evaluate(
+            server_round, parameters, client_manager
+        )
+
+    def aggregate_evaluate(
+        self,
+        server_round: int,
+        results: list[tuple[ClientProxy, EvaluateRes]],
+        failures: list[tuple[ClientProxy, EvaluateRes] | BaseException],
+    ) -> tuple[float | None, dict[str, Scalar]]:
+        return self._strategy.aggregate_evaluate(server_round, results, failures)
+
+    def evaluate(
+        self, server_round: int, parameters: Parameters
+    ) -> tuple[float, dict[str, Scalar]] | None:
+        return self._strategy.evaluate(server_round, parameters)
+
+
+class UpdateCodecStrategy(StrategyWrapper):
+    def __init__(
+        self,
+        strategy: Strategy,
+        aggregate_metrics_fn: Callable[[dict[str, Scalar]], None] | None = None,
+        compressor: Compressor | None = None,
+        downlink_delta: bool = False,
+        flat_layout: FlatLayout | None = None,
+        flat_batch_size: int = 8,
+        flat_threads: int = 1,
+        fit_results_fn: (
+            Callable[[list[tuple[ClientProxy, int, Metrics]]], None] | None
+        ) = None,
+    ) -> None:
+        super().__init__(strategy)
+        self._aggregate_metrics_fn = aggregate_metrics_fn
+        self._compressor = compressor
+        self._downlink_delta = downlink_delta
+        self._flat_layout = flat_layout
+        self._flat_batch_size = flat_batch_size
+        self._flat_threads = flat_threads
+        self._fit_results_fn = fit_results_fn
+        self._fit_metrics_aggregation_fn = getattr(
+            strategy, "fit_metrics_aggregation_fn", None
+        )
+        if self._fit_metrics_aggregation_fn is not None:
+            setattr(strategy, "fit_metrics_aggregation_fn", discard_metrics)
+        self._global_weights: list[np.ndarray] = []
+        self._global_versions: dict[int, list[np.ndarray]] = {}
+        self._client_versions: dict[str, int] = {}
+        self._client_names: dict[str, str] = {}
+        self._full_broadcasts: dict[str, tuple[Parameters, dict[str, Scalar]]] = {}
+        self._broadcast_metrics: dict[str, Scalar] = {}
+
+    def configure_fit(
+        self, server_round: int, parameters: Parameters, client_manager: ClientManager
+    ) -> list[tuple[ClientProxy, FitIns]]:
+        self._global_weights = parameters_to_arrays(parameters)
+        instructions = super().configure_fit(server_round, parameters, client_manager)
+        self._log_participants(server_round, instructions, client_manager)
+
+        start_encode_time = time.perf_counter()
+        if self._downlink_delta:
+            connected = client_manager.all()
+            self._client_versions = {
+                cid: version
+                for cid, version in self._client_versions.items()
+                if cid in connected
+            }
+            self._global_versions[server_round] = self._global_weights
+            self._global_versions = {
+                version: weights
+                for version, weights in self._global_versions.items()
+                if version == server_round or version in self._client_versions.values()
+            }
+
+        encoded: dict[tuple[int, int | None], Parameters] = {}
+        client_instructions = []
+        num_delta = 0
+        self._full_broadcasts = {}
+
+        for client, fit_ins in instructions:
+            config = dict(fit_ins.config)
+            base_version = None
+
+            if fit_ins.parameters is parameters:
+                config["global_version"] = server_round
+                base_version = self._client_versions.get(client.cid)
+                if base_version not in self._global_versions:
+                    base_version = None
+
+            key = (id(fit_ins.parameters), base_version)
+            if key not in encoded:
+                encoded[key] = self._encode_broadcast(fit_ins.parameters, base_version)
+
+            if base_version is not None:
+                self._full_broadcasts[client.cid] = (fit_ins.parameters, dict(config))
+                config["base_version"] = base_version
+                num_delta += 1
+
+            client_instructions.append(
+                (client, FitIns(parameters=encoded[key], config=config))
+            )
+
+        self._broadcast_metrics = {
+            "downlink_bytes": sum(
+                parameters_size(fit_ins.parameters)
+                for _, fit_ins in client_instructions
+            ),
+            "downlink_delta_clients": num_delta,
+            "downlink_full_clients": len(client_instructions) - num_delta,
+            "downlink_resent_clients": 0,
+            "broadcast_encode_time": time.perf_counter() - start_encode_time,
+        }
+
+        return client_instructions
+
+    def _log_participants(
+        self,
+        server_round: int,
+        instructions: list[tuple[ClientProxy, FitIns]],
+        client_manager: ClientManager,
+    ) -> None:
+        names = sorted(
+            self._client_names.get(client.cid, client.cid) for client, _ in instructions
+        )
+        log(
+            f"[ROUND {server_round}] {len(instructions)} of "
+            f"{client_manager.num_available()} clients selected: {', '.join(names)}"
+        )
+
+    def resend_full_model(
+        self,
+        server_round: int,
+        results: list[tuple[ClientProxy, FitRes]],
+        timeout: float | None = None,
+    ) -> FitResultsAndFailures:
+        missing = [
+            client
+            for client, fit_res in results
+            if fit_res.metrics.get(MISSING_BASE_VERSION) is True
+        ]
+        if not missing:
+            return results, []
+
+        log(
+            f"[ROUND {server_round}] Resending the full model to {len(missing)} "
+            f"clients without the base version of the delta"
+        )
+
+        encoded: dict[int, Parameters] = {}
+        instructions = []
+        for client in missing:
+            parameters, config = self._full_broadcasts[client.cid]
+            if id(parameters) not in encoded:
+                encoded[id(parameters)] = self._encode_broadcast(parameters, None)
+            instructions.append(
+                (client, FitIns(parameters=encoded[id(parameters)], config=config))
+            )
+
+        self._broadcast_metrics["downlink_bytes"] = int(
+            self._broadcast_metrics["downlink_bytes"]
+        ) + sum(parameters_size(fit_ins.parameters) for _, fit_ins in instructions)
+        self._broadcast_metrics["downlink_resent_clients"] = len(instructions)
+
+        resent_results, failures = fit_clients(
+            instructions, max_workers=None, timeout=timeout, group_id=server_round
+        )
+        return [
+            (client, fit_res)
+            for client, fit_res in results
+            if fit_res.metrics.get(MISSING_BASE_VERSION) is not True
+        ] + resent_results, failures
+
+    def _encode_broadcast(
+        self, parameters: Parameters, base_version: int | None
+    ) -> Parameters:
+        if base_version is not None:
+            parameters = arrays_to_parameters(
+                xor_arrays(
+                    parameters_to_arrays(parameters),
+                    self._global_versions[base_version],
+                )
+            )
+
+        if self._compressor is not None:
+            parameters = compress_parameters(parameters, self._compressor)
+
+        return parameters
+
+    @property
+    def weighted_mean(self) -> bool:
+        return type(self._strategy) in WEIGHTED_MEAN_STRATEGIES
+
+    def weighted_sum(self) -> "WeightedSum":
+        if self._flat_layout is not None:
+            return FlatWeightedSum(
+                self._global_weights,
+                self._flat_layout,
+                self._flat_batch_size,
+                self._flat_threads,
+            )
+        return WeightedSum(self._global_weights)
+
+    def aggregate_fit(
+        self,
+        server_round: int,
+        results: list[tuple[ClientProxy, FitRes]],
+        failures: list[tuple[ClientProxy, FitRes] | BaseException],
+    ) -> tuple[Parameters | None, dict[str, Scalar]]:
+        results, resent_failures = self.resend_full_model(server_round, results)
+        failures = [*failures, *resent_failures]
+
+        if self.weighted_mean and (
+            self._flat_layout is not None
+            or any(
+                fit_res.parameters.tensor_type != TENSOR_TYPE for _, fit_res in results
+            )
+        ):
+            aggregate = self.weighted_sum()
+            for client, fit_res in results:
+                aggregate.add(client, fit_res)
+            return self.aggregate_weighted_sum(server_round, aggregate, failures)
+
+        start_aggregate_time = time.perf_counter()
+        self._record_results(
+            [
+                (client, fit_res.num_examples, fit_res.metrics)
+                for client, fit_res in results
+            ],
+            failures,
+        )
+        decoded_results = [
+            (client, self._decode(self._decompress(fit_res)))
+            for client, fit_res in results
+        ]
+        parameters, metrics = self._strategy.aggregate_fit(
+            server_round, decoded_results, failures
+        )
+        metrics = self._aggregate_fit_metrics(
+            [(fit_res.num_examples, fit_res.metrics) for _, fit_res in decoded_results],
+            metrics,
+        )
+
+        self._record_aggregate(
+            server_round,
+            "weights",
+            len(results),
+            sum(parameters_size(fit_res.parameters) for _, fit_res in results),
+            time.perf_counter() - start_aggregate_time,
+        )
+
+        return parameters, metrics
+
+    def aggregate_weighted_sum(
+        self,
+        server_round: int,
+        aggregate: "WeightedSum",
+        failures: list[tuple[ClientProxy, FitRes] | BaseException],
+    ) -> tuple[Parameters | None, dict[str, Scalar]]:
+        start_aggregate_time = time.perf_counter()
+        self._record_results(aggregate.results, failures)
+
+        parameters, metrics = self._strategy.aggregate_fit(
+            server_round,
+            (
+                [(aggregate.results[0][0], aggregate.result())]
+                if aggregate.results
+                else []
+            ),
+            failures,
+        )
+
+        metrics = self._aggregate_fit_metrics(
+            [
+                (num_examples, client_metrics)
+                for _, num_examples, client_metrics in aggregate.results
+            ],
+            metrics,
+        )
+
+        self._record_aggregate(
+            server_round,
+            "weighted_sum",
+            len(aggregate.results),
+            aggregate.update_bytes,
+            aggregate.aggregate_time + time.perf_counter() - start_aggregate_time,
+        )
+
+        return parameters, metrics
+
+    def fit_config(self) -> dict[str, Scalar]:
+        proximal_mu = getattr(self._strategy, "proximal_mu", None)
+        if proximal_mu is None:
+            return {}
+
+        return {"proximal_mu": proximal_mu}
+
+    def aggregate_buffer(
+        self,
+        server_round: int,
+        client: ClientProxy,
+        weights: list[np.ndarray],
+        num_examples: int,
+    ) -> Parameters | None:
+        parameters, _ = self._strategy.aggregate_fit(
+            server_round,
+            [
+                (
+                    client,
+                    FitRes(
+                        status=Status(code=Code.OK, message="Success"),
+                        parameters=arrays_to_parameters(weights),
+                        num_examples=num_examples,
+                        metrics={},
+                    ),
+                )
+            ],
+            [],
+        )
+        return parameters
+
+    def _aggregate_fit_metrics(
+        self, results: list[tuple[int, Metrics]], metrics: dict[str, Scalar]
+    ) -> dict[str, Scalar]:
+        if self._fit_metrics_aggregation_fn is None or not results:
+            return metrics
+
+        return self._fit_metrics_aggregation_fn(results)
+
+    def _record_aggregate(
+        self,
+        server_round: int,
+        mode: str,
+        num_results: int,
+        update_bytes: int,
+        aggregate_time: float,
+    ) -> None:
+        if self._aggregate_metrics_fn is None:
+            return
+
+        self._aggregate_metrics_fn(
+            {
+                "round": server_round,
+                "mode": mode,
+                "num_results": num_results,
+                "update_bytes": update_bytes,
+                "aggregate_time": aggregate_time,
+                **self._broadcast_metrics,
+            }
+        )
+
+    def _record_results(
+        self,
+        results: list[tuple[ClientProxy, int, Metrics]],
+        failures: list[tuple[ClientProxy, FitRes] | BaseException],
+    ) -> None:
+        if self._fit_results_fn is not None:
+            self._fit_results_fn(results)
+
+        for client, _, metrics in results:
+            if "client_name" in metrics:
+                self._client_names[client.cid] = str(metrics["client_name"])
+
+        if not self._downlink_delta:
+            return
+
+        for client, _, metrics in results:
+            version = metrics.get("global_version")
+            if isinstance(version, int):
+                self._client_versions[client.cid] = version
+            else:
+                self._client_versions.pop(client.cid, None)
+
+        for failure in failures:
+            if isinstance(failure, tuple):
+                self._client_versions.pop(failure[0].cid, None)
+
+    @staticmethod
+    def _decompress(fit_res: FitRes) -> FitRes:
+        parameters = decompress_parameters(fit_res.parameters)
+        if parameters is fit_res.parameters:
+            return fit_res
+
+        return FitRes(
+            status=fit_res.status,
+            parameters=parameters,
+            num_examples=fit_res.num_examples,
+            metrics=fit_res.metrics,
+        )
+
+    def _decode(self, fit_res: FitRes) -> FitRes:
+        codec = codec_from_tensor_type(fit_res.parameters.tensor_type)
+        if codec is None:
+            return fit_res
+
+        arrays = codec.decode(fit_res.parameters)
+        if codec.delta:
+            arrays = [
+                (weight + delta).astype(weight.dtype, copy=False)
+                for weight, delta in zip(self._global_weights, arrays)
+            ]
+
+        return FitRes(
+            status=fit_res.status,
+            parameters=arrays_to_parameters(arrays),
+            num_examples=fit_res.num_examples,
+            metrics=fit_res.metrics,
+        )
+
+
+class WeightedSum:
+    def __init__(self, global_weights: list[np.ndarray]) -> None:
+        self._global_weights = global_weights
+        self._sums = self._allocate()
+        self._num_examples = 0
+        self._delta_examples = 0
+        self.results: list[tuple[ClientProxy, int, dict[str, Scalar]]] = []
+        self.update_bytes = 0
+        self.aggregate_time = 0.0
+
+    def add(self, client: ClientProxy, fit_res: FitRes) -> None:
+        start_aggregate_time = time.perf_counter()
+        self.update_bytes += parameters_size(fit_res.parameters)
+        parameters = decompress_parameters(fit_res.parameters)
+        codec = codec_from_tensor_type(parameters.tensor_type)
+        num_examples = fit_res.num_examples
+
+        if codec is None:
+            self._add_weights(parameters, num_examples)
+        else:
+            codec.accumulate(parameters, self._sums, num_examples)
+            if codec.delta:
+                self._delta_examples += num_examples
+
+        self._num_examples += num_examples
+        self.results.append((client, num_examples, fit_res.metrics))
+        self.aggregate_time += time.perf_counter() - start_aggregate_time
+
+    def _allocate(self) -> list[np.ndarray]:
+        return [
+            np.zeros(weight.shape, dtype=np.float32) for weight in self._global_weights
+        ]
+
+    def _add_weights(self, parameters: Parameters, num_examples: int) -> None:
+        arrays = parameters_to_arrays(parameters)
+        if len(arrays) != len(self._sums):
+            raise ValueError(
+                f"Expected {len(self._sums)} arrays, got {len(arrays)} arrays."
+            )
+
+        for total, array in zip(self._sums, arrays):
+            total += num_examples * array
+
+    def result(self) -> FitRes:
+        weights = [
+            ((total + self._delta_examples * weight) / self._num_examples).astype(
+                weight.dtype, copy=False
+            )
+            for total, weight in zip(self._sums, self._global_weights)
+        ]
+
+        return FitRes(
+            status=Status(code=Code.OK, message="Success"),
+            parameters=arrays_to_parameters(weights),
+            num_examples=self._num_examples,
+            metrics={},
+        )
+
+
+class FlatWeightedSum(WeightedSum):
+    def __init__(
+        self,
+        global_weights: list[np.ndarray],
+        layout: FlatLayout,
+        batch_size: int = 8,
+        num_threads: int = 1,
+    ) -> None:
+        self._layout = layout
+        self._batch_size = batch_size
+        self._batch: list[tuple[list[np.ndarray], float]] = []
+        self._chunks = layout.chunks(FLAT_CHUNK_SIZE)
+        self._num_threads = min(num_threads, len(self._chunks))
+        self._scratch = [
+            np.empty((batch_size, FLAT_CHUNK_SIZE), dtype=np.float32)
+            for _ in range(self._num_threads)
+        ]
+        super().__init__(global_weights)
+
+    def _allocate(self) -> list[np.ndarray]:
+        self._sum = np.zeros(self._layout.size, dtype=np.float32)
+        return self._layout.views(self._sum)
+
+    def _add_weights(self, parameters: Parameters, num_examples: int) -> None:
+        self._batch.append(
+            (self._layout.flat_views(parameters.tensors), float(num_examples))
+        )
+
+        if len(self._batch) == self._batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._batch:
+            return
+
+        if self._num_threads == 1:
+            self._reduce(0)
+        else:
+            with ThreadPoolExecutor(max_workers=self._num_threads) as executor:
+                list(executor.map(self._reduce, range(self._num_threads)))
+
+        self._batch = []
+
+    def _reduce(self, worker: int) -> None:
+        scratch = self._scratch[worker]
+        coefficients = np.array(
+            [coefficient for _, coefficient in self._batch], dtype=np.float32
+        )
+
+        for layer, start, end in self._chunks[worker :: self._num_threads]:
+            offset = self._layout.offsets[layer]
+            total = self._sum[offset + start : offset + end]
+            stacked = scratch[: len(self._batch), : end - start]
+
+            np.stack(
+                [arrays[layer][start:end] for arrays, _ in self._batch], out=stacked
+            )
+            total += coefficients @ stacked
+
+    def result(self) -> FitRes:
+        start_aggregate_time = time.perf_counter()
+        self._flush()
+        self.aggregate_time += time.perf_counter() - start_aggregate_time
+        return super().result()
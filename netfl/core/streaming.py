@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from flwr.common import Code, FitRes, Parameters, Scalar
+from flwr.server import Server as FlowerServer
+from flwr.server.client_manager import ClientManager
+from flwr.server.client_proxy import ClientProxy
+from flwr.server.server import FitResultsAndFailures, fit_client
+
+from netfl.core.strategy import UpdateCodecStrategy
+from netfl.utils.codecs import MISSING_BASE_VERSION
+from netfl.utils.log import log
+
+
+class StreamingServer(FlowerServer):
+    def __init__(
+        self, client_manager: ClientManager, strategy: UpdateCodecStrategy
+    ) -> None:
+        super().__init__(client_manager=client_manager, strategy=strategy)
+        self._codec_strategy = strategy
+
+    def fit_round(
+        self,
+        server_round: int,
+        timeout: float | None,
+    ) -> tuple[Parameters | None, dict[str, Scalar], FitResultsAndFailures] | None:
+        if not self._codec_strategy.weighted_mean:
+            return super().fit_round(server_round, timeout)
+
+        client_instructions = self.strategy.configure_fit(
+            server_round=server_round,
+            parameters=self.parameters,
+            client_manager=self._client_manager,
+        )
+        if not client_instructions:
+            log("configure_fit: no clients selected, cancel")
+            return None
+
+        aggregate = self._codec_strategy.weighted_sum()
+        missing: list[tuple[ClientProxy, FitRes]] = []
+        failures: list[tuple[ClientProxy, FitRes] | BaseException] = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for future in as_completed(
+                {
+                    executor.submit(fit_client, client, ins, timeout, server_round)
+                    for client, ins in client_instructions
+                }
+            ):
+                failure = future.exception()
+                if failure is not None:
+                    failures.append(failure)
+                    continue
+
+                client, fit_res = future.result()
+                if fit_res.status.code != Code.OK:
+                    failures.append((client, fit_res))
+                elif fit_res.metrics.get(MISSING_BASE_VERSION) is True:
+                    missing.append((client, fit_res))
+                else:
+                    aggregate.add(client, fit_res)
+
+        resent_results, resent_failures = self._codec_strategy.resend_full_model(
+            server_round, missing, timeout
+        )
+        for client, fit_res in resent_results:
+            aggregate.add(client, fit_res)
+        failures.extend(resent_failures)
+
+        log(
+            f"aggregate_fit: streamed {len(aggregate.results)} results "
+            f"and {len(failures)} failures"
+        )
+
+        parameters, metrics = self._codec_strategy.aggregate_weighted_sum(
+            server_round, aggregate, failures
+        )
+        return parameters, metrics, ([], failures)
@@ -1,16 +1,51 @@
+import os
 import json
+from functools import partial, cached_property
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable
 
+import numpy as np
 import tensorflow as tf
-from keras import models
+from keras import models, mixed_precision
 from datasets import DownloadConfig
+import datasets
 from flwr_datasets import FederatedDataset, partitioner
 from flwr.server.strategy import Strategy
 
 from netfl.utils.log import log
 from netfl.utils.net import execute
+from netfl.utils.compression import get_compressor
+from netfl.utils.codecs import validate_codec, validate_topk_ratio
+from netfl.core.selection import validate_client_selection
+from netfl.core.strategy import WEIGHTED_MEAN_STRATEGIES
+from netfl.utils.partitions import (
+    PARTITION_STATISTICS_DIR,
+    CachedPartitioner,
+    PartitionStatistics,
+    compute_partition_index,
+    partition_statistics,
+    write_partition_statistics,
+)
+from netfl.utils.dataset import (
+    SHARDS_DIR,
+    SNAPSHOTS_DIR,
+    CACHE_MODES,
+    CacheMode,
+    cache_key,
+    shard_name,
+    has_shard,
+    write_shard,
+    load_shard,
+    DatasetColumn,
+    column_array,
+    stratified_indices,
+    LocalFormat,
+    local_dataset_source,
+    save_local_dataset,
+)
+
+PRECISION_POLICIES = ("float32", "mixed_float16", "mixed_bfloat16")
 
 
 @dataclass
@@ -22,6 +57,152 @@ class TrainConfigs:
     num_rounds: int
     seed_data: int
     shuffle_data: bool
+    shard_data: bool = False
+    memory_map_data: bool = False
+    streaming_data: bool = False
+    shuffle_buffer_size: int | None = None
+    cache_data: CacheMode | None = None
+    evaluate_batch_size: int | None = None
+    evaluate_every: int = 1
+    evaluate_subsample_size: int | None = None
+    cache_partitions: bool = False
+    precision_policy: str | None = None
+    update_codec: str | None = None
+    update_topk_ratio: float = 0.01
+    update_delta: bool = False
+    parameters_compression: str | None = None
+    parameters_compression_level: int | None = None
+    downlink_delta: bool = False
+    streaming_aggregation: bool = False
+    flat_aggregation: bool = False
+    flat_aggregation_batch_size: int = 8
+    flat_aggregation_threads: int = 1
+    async_buffer_size: int | None = None
+    async_staleness_exponent: float = 0.5
+    clients_per_round: int | None = None
+    fraction_fit: float | None = None
+    client_selection: str = "uniform"
+
+    def __post_init__(self) -> None:
+        self._validate_data()
+        self._validate_evaluate()
+        self._validate_updates()
+        self._validate_aggregation()
+        self._validate_participation()
+
+    def _validate_data(self) -> None:
+        if self.num_clients > self.num_partitions:
+            raise ValueError(
+                "The num_clients must be less than or equal to num_partitions."
+            )
+
+        if self.shuffle_buffer_size is not None and self.shuffle_buffer_size <= 0:
+            raise ValueError(
+                f"The shuffle_buffer_size must be positive, got {self.shuffle_buffer_size}."
+            )
+
+        if self.cache_data is not None and self.cache_data not in CACHE_MODES:
+            raise ValueError(
+                f"Invalid cache_data: {self.cache_data}. Must be one of {CACHE_MODES}"
+            )
+
+        if (
+            self.precision_policy is not None
+            and self.precision_policy not in PRECISION_POLICIES
+        ):
+            raise ValueError(
+                f"Invalid precision_policy: {self.precision_policy}. Must be one of {PRECISION_POLICIES}"
+            )
+
+    def _validate_evaluate(self) -> None:
+        if self.evaluate_every <= 0:
+            raise ValueError(
+                f"The evaluate_every must be positive, got {self.evaluate_every}."
+            )
+
+        if (
+            self.evaluate_subsample_size is not None
+            and self.evaluate_subsample_size <= 0
+        ):
+            raise ValueError(
+                f"The evaluate_subsample_size must be positive, got {self.evaluate_subsample_size}."
+            )
+
+    def _validate_updates(self) -> None:
+        if self.update_codec is not None:
+            validate_codec(self.update_codec)
+            validate_topk_ratio(self.update_topk_ratio)
+
+        if self.parameters_compression is not None:
+            get_compressor(
+                self.parameters_compression, self.parameters_compression_level
+            )
+
+        if self.downlink_delta and self.parameters_compression is None:
+            raise ValueError("The downlink_delta requires a parameters_compression.")
+
+    def _validate_aggregation(self) -> None:
+        if self.flat_aggregation_batch_size <= 0:
+            raise ValueError(
+                f"The flat_aggregation_batch_size must be positive, got {self.flat_aggregation_batch_size}."
+            )
+
+        if self.flat_aggregation_threads <= 0:
+            raise ValueError(
+                f"The flat_aggregation_threads must be positive, got {self.flat_aggregation_threads}."
+            )
+
+        if self.async_buffer_size is None:
+            return
+
+        if not 0 < self.async_buffer_size <= self.num_clients:
+            raise ValueError(
+                f"The async_buffer_size must be between 1 and num_clients, got {self.async_buffer_size}."
+            )
+
+        if self.async_staleness_exponent < 0:
+            raise ValueError(
+                f"The async_staleness_exponent must be non-negative, got {self.async_staleness_exponent}."
+            )
+
+        if self.downlink_delta:
+            raise ValueError(
+                "The downlink_delta is not supported with async_buffer_size."
+            )
+
+        if self.streaming_aggregation or self.flat_aggregation:
+            raise ValueError(
+                "The streaming_aggregation and flat_aggregation are not supported with async_buffer_size."
+            )
+
+    def _validate_participation(self) -> None:
+        validate_client_selection(self.client_selection)
+
+        if self.clients_per_round is not None and self.fraction_fit is not None:
+            raise ValueError(
+                "Only one of clients_per_round and fraction_fit can be set."
+            )
+
+        if self.clients_per_round is not None and not (
+            0 < self.clients_per_round <= self.num_clients
+        ):
+            raise ValueError(
+                f"The clients_per_round must be between 1 and num_clients, got {self.clients_per_round}."
+            )
+
+        if self.fraction_fit is not None and not 0 < self.fraction_fit <= 1:
+            raise ValueError(
+                f"The fraction_fit must be in (0, 1], got {self.fraction_fit}."
+            )
+
+        if self.async_buffer_size is not None and (
+            self.clients_per_round is not None
+            or self.fraction_fit is not None
+            or self.client_selection != "uniform"
+        ):
+            raise ValueError(
+                "Partial participation and client_selection are not supported with async_buffer_size."
+            )
 
 
 @dataclass
@@ -31,12 +212,15 @@ class DatasetInfo:
     label_key: str
     input_dtype: tf.DType
     label_dtype: tf.DType
+    local_path: str | None = None
+    local_format: LocalFormat = "parquet"
+    input_storage_dtype: tf.DType | None = None
 
 
 @dataclass
 class Dataset:
-    x: tf.Tensor
-    y: tf.Tensor
+    x: tf.Tensor | np.ndarray | DatasetColumn
+    y: tf.Tensor | np.ndarray | DatasetColumn
 
 
 class DatasetPartitioner(ABC):
@@ -48,33 +232,118 @@ class DatasetPartitioner(ABC):
     ) -> tuple[dict[str, Any], partitioner.Partitioner]:
         pass
 
+    def build(
+        self,
+        dataset_info: DatasetInfo,
+        train_configs: TrainConfigs,
+    ) -> tuple[dict[str, Any], "partitioner.Partitioner"]:
+        configs, dataset_partitioner = self.partitioner(dataset_info, train_configs)
+
+        if train_configs.cache_partitions:
+            dataset_partitioner = CachedPartitioner(
+                dataset_partitioner,
+                {
+                    **configs,
+                    "seed_data": train_configs.seed_data,
+                    "shuffle_data": train_configs.shuffle_data,
+                },
+                dataset_info.input_key,
+            )
+
+        return configs, dataset_partitioner
+
+    def statistics(
+        self,
+        dataset: datasets.Dataset,
+        dataset_info: DatasetInfo,
+        train_configs: TrainConfigs,
+        directory: str | None = PARTITION_STATISTICS_DIR,
+    ) -> PartitionStatistics:
+        _, dataset_partitioner = self.build(dataset_info, train_configs)
+
+        statistics = partition_statistics(
+            compute_partition_index(
+                dataset_partitioner, dataset, dataset_info.input_key
+            ),
+            column_array(dataset, dataset_info.label_key),
+        )
+        log(
+            f"[PARTITION STATISTICS]\n{json.dumps(statistics.summary(), indent=2, default=str)}"
+        )
+
+        if directory is not None:
+            write_partition_statistics(statistics, directory)
+            log(f"Partition statistics written to {directory}")
+
+        return statistics
+
 
 class Task(ABC):
     def __init__(self):
         self._train_configs = self.train_configs()
         self._dataset_info = self.dataset_info()
 
-        if self._train_configs.num_clients > self._train_configs.num_partitions:
+        strategy_type, _ = self.aggregation_strategy()
+        if (
+            self._train_configs.async_buffer_size is not None
+            and strategy_type not in WEIGHTED_MEAN_STRATEGIES
+        ):
             raise ValueError(
-                "The num_clients must be less than or equal to num_partitions."
+                f"The async_buffer_size is not supported with {strategy_type.__name__}."
             )
 
         (
             self._dataset_partitioner_configs,
             self._dataset_partitioner,
-        ) = self.dataset_partitioner().partitioner(
+        ) = self.dataset_partitioner().build(
             self._dataset_info,
             self._train_configs,
         )
 
-        self._fldataset = FederatedDataset(
-            dataset=self._dataset_info.huggingface_path,
+    @cached_property
+    def _fldataset(self) -> FederatedDataset:
+        return FederatedDataset(
             partitioners={"train": self._dataset_partitioner},
             seed=self._train_configs.seed_data,
             shuffle=self._train_configs.shuffle_data,
-            trust_remote_code=True,
             streaming=False,
-            download_config=DownloadConfig(max_retries=0, num_proc=1),
+            **self._dataset_source(),
+        )
+
+    def _dataset_source(self) -> dict[str, Any]:
+        if self._dataset_info.local_path is not None:
+            return local_dataset_source(
+                self._dataset_info.local_path, self._dataset_info.local_format
+            )
+
+        return {
+            "dataset": self._dataset_info.huggingface_path,
+            "trust_remote_code": True,
+            "download_config": DownloadConfig(max_retries=0, num_proc=1),
+        }
+
+    def prepare_dataset(self) -> None:
+        if self._dataset_info.local_path is None:
+            raise ValueError("The local_path must be set to prepare the dataset.")
+
+        dataset = execute(
+            lambda: datasets.load_dataset(
+                self._dataset_info.huggingface_path,
+                trust_remote_code=True,
+                download_config=DownloadConfig(max_retries=0, num_proc=1),
+            )
+        )
+
+        save_local_dataset(
+            dataset,
+            self._dataset_info.local_path,
+            self._dataset_info.local_format,
+            self._dataset_info.input_key,
+            self._dataset_info.label_key,
+        )
+        log(
+            f"Dataset {self._dataset_info.huggingface_path} prepared in "
+            f"{self._dataset_info.local_path} ({self._dataset_info.local_format})"
         )
 
     def print_configs(self, model: models.Model) -> None:
@@ -102,57 +371,353 @@ class Task(ABC):
             f"[TRAIN CONFIGS]\n{json.dumps(asdict(self._train_configs), indent=2, default=str)}"
         )
 
+    def write_shards(self, directory: str = SHARDS_DIR) -> None:
+        input_key = self._dataset_info.input_key
+        label_key = self._dataset_info.label_key
+
+        for partition_id in range(self._train_configs.num_clients):
+            partition = execute(
+                lambda: self._fldataset.load_partition(partition_id, "train")
+            )
+            write_shard(
+                partition, input_key, label_key, shard_name(partition_id), directory
+            )
+            log(f"Shard of partition {partition_id} written to {directory}")
+
+    def partition_statistics(
+        self, directory: str | None = PARTITION_STATISTICS_DIR
+    ) -> PartitionStatistics:
+        return self.dataset_partitioner().statistics(
+            execute(lambda: self._fldataset.load_split("train")),
+            self._dataset_info,
+            self._train_configs,
+            directory,
+        )
+
     def train_dataset(self, client_id: int) -> Dataset:
         if client_id >= self._train_configs.num_partitions:
             raise ValueError(
                 f"The client_id must be less than num_partitions, got {client_id}."
             )
 
-        partition = execute(
-            lambda: self._fldataset.load_partition(client_id, "train").with_format(
-                "numpy"
-            )
-        )
+        name = shard_name(client_id)
+        load = partial(self._fldataset.load_partition, client_id, "train")
 
-        input_key = self._dataset_info.input_key
-        label_key = self._dataset_info.label_key
+        if self._train_configs.shard_data and (
+            self._train_configs.memory_map_data or self._train_configs.streaming_data
+        ):
+            return self._memory_mapped_dataset(name, load)
 
-        input_dtype = self._dataset_info.input_dtype
-        label_dtype = self._dataset_info.label_dtype
+        if self._train_configs.memory_map_data:
+            return self._memory_mapped_dataset(self._shard_key(name), load)
 
-        x = tf.convert_to_tensor(partition[input_key], dtype=input_dtype)
-        y = tf.convert_to_tensor(partition[label_key], dtype=label_dtype)
+        if self._train_configs.streaming_data:
+            return self._streaming_dataset(load)
 
-        return self.preprocess_dataset(Dataset(x, y), True)
+        if self._train_configs.shard_data:
+            x, y = load_shard(name)
+        else:
+            partition = execute(lambda: load().with_format("numpy"))
+            x, y = (
+                partition[self._dataset_info.input_key],
+                partition[self._dataset_info.label_key],
+            )
+
+        return self._preprocess_tensor_dataset(self._tensor_dataset(x, y), True)
 
     def test_dataset(self) -> Dataset:
-        test_dataset = execute(
-            lambda: self._fldataset.load_split("test").with_format("numpy")
+        load = partial(self._fldataset.load_split, "test")
+
+        if self._train_configs.memory_map_data:
+            return self._memory_mapped_dataset(self._shard_key("test"), load)
+
+        if self._train_configs.streaming_data:
+            return self._streaming_dataset(load)
+
+        test_dataset = execute(lambda: load().with_format("numpy"))
+
+        x = test_dataset[self._dataset_info.input_key]
+        y = test_dataset[self._dataset_info.label_key]
+
+        return self._preprocess_tensor_dataset(self._tensor_dataset(x, y), False)
+
+    def build_model(self) -> models.Model:
+        precision_policy = self._train_configs.precision_policy
+        if precision_policy is None:
+            return self.model()
+
+        global_policy = mixed_precision.global_policy()
+        mixed_precision.set_global_policy(precision_policy)
+        try:
+            return self.model()
+        finally:
+            mixed_precision.set_global_policy(global_policy)
+
+    def subsample_dataset(self, dataset: Dataset, size: int) -> Dataset:
+        length = int(dataset.y.shape[0])  # type: ignore[index]
+
+        if isinstance(dataset.y, tf.Tensor):
+            labels = dataset.y.numpy()
+        else:
+            labels = dataset.y[np.arange(length)]
+
+        indices = stratified_indices(labels, size, self._train_configs.seed_data)
+
+        if isinstance(dataset.x, tf.Tensor):
+            return Dataset(
+                x=tf.gather(dataset.x, indices), y=tf.gather(dataset.y, indices)
+            )
+
+        return Dataset(x=dataset.x[indices], y=dataset.y[indices])
+
+    def _tensor_dataset(self, x: np.ndarray, y: np.ndarray) -> Dataset:
+        return Dataset(
+            x=tf.convert_to_tensor(
+                x,
+                dtype=self._dataset_info.input_storage_dtype
+                or self._dataset_info.input_dtype,
+            ),
+            y=tf.convert_to_tensor(y, dtype=self._dataset_info.label_dtype),
         )
 
-        input_key = self._dataset_info.input_key
-        label_key = self._dataset_info.label_key
+    def _preprocess_tensor_dataset(self, dataset: Dataset, training: bool) -> Dataset:
+        if self._dataset_info.input_storage_dtype is not None:
+            return dataset
+
+        return self.preprocess_dataset(dataset, training)
+
+    def _memory_mapped_dataset(
+        self, name: str, load: Callable[[], datasets.Dataset]
+    ) -> Dataset:
+        if not has_shard(name):
+            write_shard(
+                execute(load),
+                self._dataset_info.input_key,
+                self._dataset_info.label_key,
+                name,
+            )
 
-        input_dtype = self._dataset_info.input_dtype
-        label_dtype = self._dataset_info.label_dtype
+        x, y = load_shard(name, memory_map=True)
 
-        x = tf.convert_to_tensor(test_dataset[input_key], dtype=input_dtype)
-        y = tf.convert_to_tensor(test_dataset[label_key], dtype=label_dtype)
+        return Dataset(x, y)
 
-        return self.preprocess_dataset(Dataset(x, y), False)
+    def _streaming_dataset(self, load: Callable[[], datasets.Dataset]) -> Dataset:
+        dataset = execute(load)
 
-    def batch_dataset(self, dataset: Dataset) -> tuple[tf.data.Dataset, int]:
+        return Dataset(
+            x=DatasetColumn(dataset, self._dataset_info.input_key),
+            y=DatasetColumn(dataset, self._dataset_info.label_key),
+        )
+
+    def batch_dataset(
+        self,
+        dataset: Dataset,
+        training: bool = True,
+        cache_name: str | None = None,
+        batch_size: int | None = None,
+        client_id: int | None = None,
+    ) -> tuple[tf.data.Dataset, int]:
         length = int(dataset.x.shape[0])  # type: ignore[index]
+        batch_size = batch_size or self._train_configs.batch_size
+        cached = self._train_configs.cache_data is not None and cache_name is not None
+        shuffle = training and not cached
+        seed = self._train_configs.seed_data + (client_id or 0)
+
+        if isinstance(dataset.x, tf.Tensor):
+            batches = self._tensor_batches(dataset, length, batch_size, shuffle, seed)
+            preprocess_dataset = self._dataset_info.input_storage_dtype is not None
+        elif isinstance(dataset.x, DatasetColumn):
+            batches = self._generated_batches(
+                dataset, length, batch_size, shuffle, seed
+            )
+            preprocess_dataset = True
+        else:
+            batches = self._indexed_batches(dataset, length, batch_size, shuffle, seed)
+            preprocess_dataset = True
+
+        if cached:
+            batches = batches.map(
+                lambda x, y: self._prepare_batch(x, y, training, preprocess_dataset),
+                num_parallel_calls=tf.data.AUTOTUNE,
+            )
+            batches = self._cached_batches(
+                batches, length, batch_size, training, cache_name, seed  # type: ignore[arg-type]
+            )
+            preprocess_dataset = False
 
-        batch_dataset = (
-            tf.data.Dataset.from_tensor_slices((dataset.x, dataset.y))
-            .shuffle(buffer_size=length)
-            .batch(self._train_configs.batch_size)
-            .prefetch(tf.data.AUTOTUNE)
-        )
+        batch_dataset = batches.map(
+            lambda x, y: self._preprocess_batch(x, y, training, preprocess_dataset),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=False,
+        ).prefetch(tf.data.AUTOTUNE)
 
         return (batch_dataset, length)
 
+    def _cached_batches(
+        self,
+        batches: tf.data.Dataset,
+        length: int,
+        batch_size: int,
+        training: bool,
+        cache_name: str,
+        seed: int,
+    ) -> tf.data.Dataset:
+        samples = batches.unbatch()
+
+        if self._train_configs.cache_data == "disk":
+            path = os.path.join(SNAPSHOTS_DIR, self._cache_key(cache_name, training))
+            samples = samples.snapshot(path)
+            log(f"Dataset {cache_name} snapshot in {path}")
+
+        if not training:
+            if self._train_configs.cache_data == "memory":
+                samples = samples.cache()
+            return samples.batch(batch_size)
+
+        indices = self._index_batches(length, batch_size, True, seed)
+
+        return (
+            samples.batch(length)
+            .cache()
+            .flat_map(
+                lambda x, y: indices.map(
+                    lambda batch_indices: (
+                        tf.gather(x, batch_indices),
+                        tf.gather(y, batch_indices),
+                    )
+                )
+            )
+        )
+
+    def _dataset_key(self) -> dict[str, Any]:
+        return {
+            "task": [cls.__name__ for cls in type(self).__mro__],
+            "dataset_info": asdict(self._dataset_info),
+            "dataset_partitioner": self._dataset_partitioner_configs,
+            "num_partitions": self._train_configs.num_partitions,
+            "seed_data": self._train_configs.seed_data,
+            "shuffle_data": self._train_configs.shuffle_data,
+        }
+
+    def _cache_key(self, cache_name: str, training: bool) -> str:
+        return cache_key(**self._dataset_key(), name=cache_name, training=training)
+
+    def _shard_key(self, name: str) -> str:
+        return f"{name}_{cache_key(**self._dataset_key(), name=name)}"
+
+    def _index_batches(
+        self, length: int, batch_size: int, shuffle: bool, seed: int
+    ) -> tf.data.Dataset:
+        indices = tf.data.Dataset.range(length)
+
+        if shuffle:
+            buffer_size = self._train_configs.shuffle_buffer_size or length
+            indices = indices.shuffle(buffer_size=min(buffer_size, length), seed=seed)
+
+        return indices.batch(batch_size)
+
+    def _shuffled_indices(
+        self, length: int, shuffle: bool, rng: np.random.Generator
+    ) -> np.ndarray:
+        if not shuffle:
+            return np.arange(length)
+
+        buffer_size = self._train_configs.shuffle_buffer_size
+        if buffer_size is None or buffer_size >= length:
+            return rng.permutation(length)
+
+        window_starts = rng.permutation(np.arange(0, length, buffer_size))
+        return np.concatenate(
+            [
+                rng.permutation(np.arange(start, min(start + buffer_size, length)))
+                for start in window_starts
+            ]
+        )
+
+    def _tensor_batches(
+        self, dataset: Dataset, length: int, batch_size: int, shuffle: bool, seed: int
+    ) -> tf.data.Dataset:
+        if not shuffle:
+            return tf.data.Dataset.from_tensor_slices((dataset.x, dataset.y)).batch(
+                batch_size
+            )
+
+        return self._index_batches(length, batch_size, shuffle, seed).map(
+            lambda indices: (
+                tf.gather(dataset.x, indices),
+                tf.gather(dataset.y, indices),
+            ),
+            num_parallel_calls=tf.data.AUTOTUNE,
+        )
+
+    def _indexed_batches(
+        self, dataset: Dataset, length: int, batch_size: int, shuffle: bool, seed: int
+    ) -> tf.data.Dataset:
+        def read(indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+            indices = np.sort(indices)
+            return dataset.x[indices], dataset.y[indices]
+
+        def read_batch(indices: tf.Tensor) -> tuple[tf.Tensor, tf.Tensor]:
+            x, y = tf.numpy_function(
+                read,
+                [indices],
+                [tf.as_dtype(dataset.x.dtype), tf.as_dtype(dataset.y.dtype)],
+                stateful=False,
+            )
+            x.set_shape((None, *dataset.x.shape[1:]))
+            y.set_shape((None, *dataset.y.shape[1:]))
+            return (x, y)
+
+        return self._index_batches(length, batch_size, shuffle, seed).map(
+            read_batch, num_parallel_calls=tf.data.AUTOTUNE
+        )
+
+    def _generated_batches(
+        self, dataset: Dataset, length: int, batch_size: int, shuffle: bool, seed: int
+    ) -> tf.data.Dataset:
+        rng = np.random.default_rng(seed)
+
+        def generate():
+            indices = self._shuffled_indices(length, shuffle, rng)
+            for start in range(0, length, batch_size):
+                batch_indices = np.sort(indices[start : start + batch_size])
+                yield dataset.x[batch_indices], dataset.y[batch_indices]
+
+        return tf.data.Dataset.from_generator(
+            generate,
+            output_signature=(
+                tf.TensorSpec(
+                    shape=(None, *dataset.x.shape[1:]),
+                    dtype=tf.as_dtype(dataset.x.dtype),
+                ),
+                tf.TensorSpec(
+                    shape=(None, *dataset.y.shape[1:]),
+                    dtype=tf.as_dtype(dataset.y.dtype),
+                ),
+            ),
+        )
+
+    def _prepare_batch(
+        self, x: tf.Tensor, y: tf.Tensor, training: bool, preprocess_dataset: bool
+    ) -> tuple[tf.Tensor, tf.Tensor]:
+        batch = Dataset(
+            x=tf.cast(x, self._dataset_info.input_dtype),
+            y=tf.cast(y, self._dataset_info.label_dtype),
+        )
+
+        if preprocess_dataset:
+            batch = self.preprocess_dataset(batch, training)
+
+        return (batch.x, batch.y)
+
+    def _preprocess_batch(
+        self, x: tf.Tensor, y: tf.Tensor, training: bool, preprocess_dataset: bool
+    ) -> tuple[tf.Tensor, tf.Tensor]:
+        x, y = self._prepare_batch(x, y, training, preprocess_dataset)
+        batch = self.preprocess_batch(Dataset(x, y), training)
+
+        return (batch.x, batch.y)
+
     @abstractmethod
     def dataset_info(self) -> DatasetInfo:
         """Provides metadata about the dataset to be used.
@@ -200,6 +765,26 @@ class Task(ABC):
         """
         pass
 
+    def preprocess_batch(self, dataset: Dataset, training: bool) -> Dataset:
+        """Applies preprocessing steps to each batch of the dataset.
+
+        This method runs inside the `tf.data` pipeline built by `batch_dataset`,
+        in parallel and per batch, instead of once over the whole dataset. Moving
+        normalization and augmentation here avoids a full preprocessed copy of
+        the dataset and takes the work off the startup path. By default, the
+        batch is returned unchanged.
+
+        Args:
+                dataset (Dataset): A batch, with `x` (features) and `y` (labels) cast to
+                        the `DatasetInfo` dtypes.
+                training (bool): A flag indicating if training-specific preprocessing
+                        should be applied. Set to `True` for training batches.
+
+        Returns:
+                Dataset: A new `Dataset` object with the transformed batch.
+        """
+        return dataset
+
     @abstractmethod
     def model(self) -> models.Model:
         """Defines and compiles the machine learning model architecture.
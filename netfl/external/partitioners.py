@@ -21,21 +21,29 @@
 # - Truncating remainder samples to achieve uniformity
 # - Clean separation of class assignment modes
 # - Added safety checks to prevent assignment overflows
+# - Vectorized label grouping and partition assembly into a CSR partition index
 #
 # These changes aim to improve experimental determinism and partition balance
 # for simulation-based federated learning setups.
 
 
 import warnings
-from typing import Any, Literal, Optional
+from typing import Literal, Optional
 
 import numpy as np
-import datasets
 from flwr_datasets.common.typing import NDArray
-from flwr_datasets.partitioner.partitioner import Partitioner
 
+from netfl.utils.dataset import column_array
+from netfl.utils.partitions import (
+    IndexedPartitioner,
+    PartitionIndex,
+    group_by_label,
+    assemble_partition_index,
+    shuffle_partitions,
+)
 
-class PathologicalPartitioner(Partitioner):
+
+class PathologicalPartitioner(IndexedPartitioner):
     def __init__(
         self,
         num_partitions: int,
@@ -55,58 +63,62 @@ class PathologicalPartitioner(Partitioner):
         self._shuffle = shuffle
         self._seed = seed
         self._rng = np.random.default_rng(seed=self._seed)
-        self._partition_id_to_indices: dict[int, list[int]] = {}
-        self._partition_id_to_unique_labels: dict[int, list[Any]] = {
-            pid: [] for pid in range(self._num_partitions)
-        }
-        self._unique_labels: list[Any] = []
-        self._unique_label_to_times_used_counter: dict[Any, int] = {}
-        self._partition_id_to_indices_determined = False
-
-    def load_partition(self, partition_id: int) -> datasets.Dataset:
-        self._check_num_partitions_correctness_if_needed()
-        self._determine_partition_id_to_indices_if_needed()
-        return self.dataset.select(self._partition_id_to_indices[partition_id])
-
-    @property
-    def num_partitions(self) -> int:
-        self._check_num_partitions_correctness_if_needed()
-        self._determine_partition_id_to_indices_if_needed()
-        return self._num_partitions
-
-    def _determine_partition_id_to_indices_if_needed(self) -> None:
-        if self._partition_id_to_indices_determined:
-            return
-        self._determine_partition_id_to_unique_labels()
-        self._count_partitions_having_each_unique_label()
-        labels = np.asarray(self.dataset[self._partition_by])
-        self._check_correctness_of_unique_label_to_times_used_counter(labels)
-        for partition_id in range(self._num_partitions):
-            self._partition_id_to_indices[partition_id] = []
-        unused_labels = []
-        for unique_label in self._unique_labels:
-            if self._unique_label_to_times_used_counter[unique_label] == 0:
-                unused_labels.append(unique_label)
-                continue
-            unique_label_to_indices = np.where(labels == unique_label)[0]
-            if self._shuffle:
-                self._rng.shuffle(unique_label_to_indices)
-            num_splits = self._unique_label_to_times_used_counter[unique_label]
-            samples_per_split = len(unique_label_to_indices) // num_splits
-            trimmed = unique_label_to_indices[: samples_per_split * num_splits]
-            split_unique_labels_to_indices = np.split(trimmed, num_splits)
-            split_index = 0
-            for partition_id in range(self._num_partitions):
-                if unique_label in self._partition_id_to_unique_labels[partition_id]:
-                    if split_index >= len(split_unique_labels_to_indices):
-                        raise ValueError(
-                            f"Split index {split_index} out of range for label {unique_label}. "
-                            f"Available splits: {len(split_unique_labels_to_indices)}"
-                        )
-                    self._partition_id_to_indices[partition_id].extend(
-                        split_unique_labels_to_indices[split_index].tolist()
-                    )
-                    split_index += 1
+        self._unique_labels: NDArray = np.array([])
+        self._partition_id_to_label_ids: NDArray = np.empty(
+            (self._num_partitions, 0), dtype=np.int64
+        )
+
+    def _compute_partition_index(self) -> PartitionIndex:
+        self._check_num_partitions_correctness()
+        labels = column_array(self.dataset, self._partition_by)
+        self._unique_labels, label_counts, label_offsets, label_to_indices = (
+            group_by_label(labels)
+        )
+        self._determine_partition_id_to_label_ids()
+        times_used = np.bincount(
+            self._partition_id_to_label_ids.reshape(-1),
+            minlength=len(self._unique_labels),
+        )
+        self._check_correctness_of_times_used(times_used, label_counts)
+
+        if self._shuffle:
+            for label_id in np.flatnonzero(times_used):
+                self._rng.shuffle(
+                    label_to_indices[
+                        label_offsets[label_id] : label_offsets[label_id + 1]
+                    ]
+                )
+
+        has_label = np.zeros(
+            (self._num_partitions, len(self._unique_labels)), dtype=bool
+        )
+        has_label[
+            np.arange(self._num_partitions)[:, None], self._partition_id_to_label_ids
+        ] = True
+        partition_ids, pair_label_ids = np.nonzero(has_label)
+
+        by_label = np.lexsort((partition_ids, pair_label_ids))
+        pairs_per_label = np.bincount(
+            pair_label_ids, minlength=len(self._unique_labels)
+        )
+        split_index = np.empty(len(by_label), dtype=np.int64)
+        split_index[by_label] = np.arange(len(by_label)) - np.repeat(
+            np.cumsum(pairs_per_label) - pairs_per_label, pairs_per_label
+        )
+
+        samples_per_split = np.zeros(len(self._unique_labels), dtype=np.int64)
+        used = times_used > 0
+        samples_per_split[used] = label_counts[used] // times_used[used]
+        partition_index = assemble_partition_index(
+            label_to_indices,
+            label_offsets[pair_label_ids]
+            + split_index * samples_per_split[pair_label_ids],
+            samples_per_split[pair_label_ids],
+            partition_ids,
+            self._num_partitions,
+        )
+
+        unused_labels = self._unique_labels[~used].tolist()
         if len(unused_labels) >= 1:
             warnings.warn(
                 f"Classes: {unused_labels} will NOT be used due to the chosen "
@@ -116,70 +128,50 @@ class PathologicalPartitioner(Partitioner):
                 f"utilize all the classes for the created partitions.",
                 stacklevel=1,
             )
-        for partition_id, indices in self._partition_id_to_indices.items():
-            if self._shuffle:
-                self._rng.shuffle(indices)
-        self._partition_id_to_indices_determined = True
-
-    def _check_num_partitions_correctness_if_needed(self) -> None:
-        if not self._partition_id_to_indices_determined:
-            if self._num_partitions > self.dataset.num_rows:
-                raise ValueError(
-                    "The number of partitions needs to be smaller than the number of "
-                    "samples in the dataset."
-                )
+        if self._shuffle:
+            shuffle_partitions(partition_index, self._rng)
+
+        return partition_index
+
+    def _check_num_partitions_correctness(self) -> None:
+        if self._num_partitions > self.dataset.num_rows:
+            raise ValueError(
+                "The number of partitions needs to be smaller than the number of "
+                "samples in the dataset."
+            )
 
-    def _determine_partition_id_to_unique_labels(self) -> None:
-        self._unique_labels = sorted(self.dataset.unique(self._partition_by))
+    def _determine_partition_id_to_label_ids(self) -> None:
         num_classes = len(self._unique_labels)
         total_class_assignments = self._num_partitions * self._num_classes_per_partition
         base_usage = total_class_assignments // num_classes
         remainder = total_class_assignments % num_classes
-        class_usage_counter = {
-            label: base_usage + (1 if i < remainder else 0)
-            for i, label in enumerate(self._unique_labels)
-        }
-        repeated_labels = []
-        for label, count in class_usage_counter.items():
-            repeated_labels.extend([label] * count)
+        class_usage = np.full(num_classes, base_usage, dtype=np.int64)
+        class_usage[:remainder] += 1
+        repeated_label_ids = np.repeat(np.arange(num_classes), class_usage)
         if self._class_assignment_mode == "random":
-            self._rng.shuffle(repeated_labels)
-        elif self._class_assignment_mode == "first-deterministic":
-            repeated_labels.sort()
+            self._rng.shuffle(repeated_label_ids)
         elif self._class_assignment_mode == "deterministic":
-            label_cycle = np.tile(
-                self._unique_labels, (total_class_assignments // num_classes) + 1
-            )
-            repeated_labels = label_cycle[:total_class_assignments].tolist()
-        for partition_id in range(self._num_partitions):
-            start = partition_id * self._num_classes_per_partition
-            end = start + self._num_classes_per_partition
-            self._partition_id_to_unique_labels[partition_id] = repeated_labels[
-                start:end
-            ]
-
-    def _count_partitions_having_each_unique_label(self) -> None:
-        for unique_label in self._unique_labels:
-            self._unique_label_to_times_used_counter[unique_label] = 0
-        for unique_labels in self._partition_id_to_unique_labels.values():
-            for unique_label in unique_labels:
-                self._unique_label_to_times_used_counter[unique_label] += 1
-
-    def _check_correctness_of_unique_label_to_times_used_counter(
-        self, labels: NDArray
+            repeated_label_ids = np.tile(
+                np.arange(num_classes), (total_class_assignments // num_classes) + 1
+            )[:total_class_assignments]
+        self._partition_id_to_label_ids = repeated_label_ids.reshape(
+            self._num_partitions, self._num_classes_per_partition
+        )
+
+    def _check_correctness_of_times_used(
+        self, times_used: NDArray, label_counts: NDArray
     ) -> None:
-        for unique_label in self._unique_labels:
-            num_unique = np.sum(labels == unique_label)
-            if self._unique_label_to_times_used_counter[unique_label] > num_unique:
-                raise ValueError(
-                    f"Label: {unique_label} is needed to be assigned to more "
-                    f"partitions "
-                    f"({self._unique_label_to_times_used_counter[unique_label]})"
-                    f" than there are samples (corresponding to this label) in the "
-                    f"dataset ({num_unique}). Please decrease the `num_partitions`, "
-                    f"`num_classes_per_partition` to avoid this situation, "
-                    f"or try `class_assignment_mode='deterministic'` to create a more "
-                    f"even distribution of classes along the partitions. "
-                    f"Alternatively use a different dataset if you can not adjust"
-                    f" the any of these parameters."
-                )
+        for label_id in np.flatnonzero(times_used > label_counts):
+            unique_label = self._unique_labels[label_id].item()
+            raise ValueError(
+                f"Label: {unique_label} is needed to be assigned to more "
+                f"partitions "
+                f"({times_used[label_id]})"
+                f" than there are samples (corresponding to this label) in the "
+                f"dataset ({label_counts[label_id]}). Please decrease the `num_partitions`, "
+                f"`num_classes_per_partition` to avoid this situation, "
+                f"or try `class_assignment_mode='deterministic'` to create a more "
+                f"even distribution of classes along the partitions. "
+                f"Alternatively use a different dataset if you can not adjust"
+                f" the any of these parameters."
+            )
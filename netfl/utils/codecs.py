@@ -0,0 +1,238 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+from flwr.common import Parameters
+
+from netfl.utils.weights import TENSOR_TYPE, ndarray_to_bytes, bytes_to_ndarray_view
+
+
+CODEC_TENSOR_TYPE_PREFIX = "netfl."
+DELTA_TENSOR_TYPE_PREFIX = "delta."
+MISSING_BASE_VERSION = "missing_base_version"
+
+
+class Codec(ABC):
+    name: str
+    num_parts: int
+    requires_delta: bool = False
+
+    def __init__(self, delta: bool = False) -> None:
+        self.delta = delta or self.requires_delta
+
+    @abstractmethod
+    def encode_array(self, array: np.ndarray) -> list[np.ndarray]:
+        pass
+
+    @abstractmethod
+    def decode_array(self, parts: list[np.ndarray]) -> np.ndarray:
+        pass
+
+    @property
+    def tensor_type(self) -> str:
+        if self.delta:
+            return f"{CODEC_TENSOR_TYPE_PREFIX}{DELTA_TENSOR_TYPE_PREFIX}{self.name}"
+        return f"{CODEC_TENSOR_TYPE_PREFIX}{self.name}"
+
+    def encode(self, arrays: list[np.ndarray]) -> Parameters:
+        tensors = [
+            ndarray_to_bytes(part)
+            for array in arrays
+            for part in self.encode_array(array)
+        ]
+        return Parameters(tensors=tensors, tensor_type=self.tensor_type)
+
+    def decode(self, parameters: Parameters) -> list[np.ndarray]:
+        parts = [bytes_to_ndarray_view(tensor) for tensor in parameters.tensors]
+        if len(parts) % self.num_parts != 0:
+            raise ValueError(
+                f"Codec '{self.name}' expects {self.num_parts} tensors per array, "
+                f"got {len(parts)} tensors."
+            )
+
+        return [
+            self.decode_array(parts[i : i + self.num_parts])
+            for i in range(0, len(parts), self.num_parts)
+        ]
+
+    def accumulate(
+        self, parameters: Parameters, out: list[np.ndarray], weight: float
+    ) -> None:
+        for array, decoded in zip(out, self.decode(parameters)):
+            array += weight * decoded
+
+
+class RawCodec(Codec):
+    name = "raw"
+    num_parts = 1
+
+    def encode_array(self, array: np.ndarray) -> list[np.ndarray]:
+        return [array]
+
+    def decode_array(self, parts: list[np.ndarray]) -> np.ndarray:
+        return parts[0]
+
+
+class Float16Codec(Codec):
+    name = "fp16"
+    num_parts = 1
+
+    def encode_array(self, array: np.ndarray) -> list[np.ndarray]:
+        if array.dtype != np.float32:
+            return [array]
+        return [array.astype(np.float16)]
+
+    def decode_array(self, parts: list[np.ndarray]) -> np.ndarray:
+        if parts[0].dtype != np.float16:
+            return parts[0]
+        return parts[0].astype(np.float32)
+
+
+class Int8Codec(Codec):
+    name = "int8"
+    num_parts = 2
+
+    def encode_array(self, array: np.ndarray) -> list[np.ndarray]:
+        if not np.issubdtype(array.dtype, np.floating):
+            return [array, np.empty(0, dtype=np.float32)]
+
+        if array.ndim > 1:
+            scale = np.abs(array.reshape(-1, array.shape[-1])).max(axis=0) / 127.0
+        else:
+            scale = np.full(1, np.abs(array).max(initial=0.0) / 127.0)
+        scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+
+        quantized = np.rint(array / self._channel_scale(scale, array.ndim))
+        return [quantized.clip(-127, 127).astype(np.int8), scale]
+
+    def decode_array(self, parts: list[np.ndarray]) -> np.ndarray:
+        quantized, scale = parts
+        if scale.size == 0:
+            return quantized
+        return quantized.astype(np.float32) * self._channel_scale(scale, quantized.ndim)
+
+    @staticmethod
+    def _channel_scale(scale: np.ndarray, ndim: int) -> np.ndarray:
+        return scale if ndim > 1 else scale[0]
+
+
+class TopKCodec(Codec):
+    name = "topk"
+    num_parts = 3
+    requires_delta = True
+
+    def __init__(self, ratio: float = 1.0, delta: bool = True) -> None:
+        super().__init__(delta)
+        validate_topk_ratio(ratio)
+        self._ratio = ratio
+
+    def encode_array(self, array: np.ndarray) -> list[np.ndarray]:
+        flat = array.reshape(-1)
+        k = min(flat.size, max(1, int(np.ceil(self._ratio * flat.size))))
+
+        if k == flat.size:
+            indices = np.arange(flat.size, dtype=np.uint32)
+        else:
+            indices = np.argpartition(np.abs(flat), flat.size - k)[flat.size - k :]
+            indices = np.sort(indices).astype(np.uint32)
+
+        return [np.array(array.shape, dtype=np.int64), indices, flat[indices]]
+
+    def decode_array(self, parts: list[np.ndarray]) -> np.ndarray:
+        shape, indices, values = parts
+        array = np.zeros(int(np.prod(shape)), dtype=values.dtype)
+        array[indices] = values
+        return array.reshape(tuple(shape))
+
+    def accumulate(
+        self, parameters: Parameters, out: list[np.ndarray], weight: float
+    ) -> None:
+        parts = [bytes_to_ndarray_view(tensor) for tensor in parameters.tensors]
+        if len(parts) != self.num_parts * len(out):
+            raise ValueError(
+                f"Codec '{self.name}' expects {self.num_parts * len(out)} tensors, "
+                f"got {len(parts)} tensors."
+            )
+
+        for i, array in enumerate(out):
+            _, indices, values = parts[i * self.num_parts : (i + 1) * self.num_parts]
+            array.reshape(-1)[indices] += weight * values
+
+
+CODECS: dict[str, type[Codec]] = {
+    codec.name: codec for codec in (RawCodec, Float16Codec, Int8Codec, TopKCodec)
+}
+
+
+def validate_codec(name: str) -> None:
+    if name not in CODECS:
+        raise ValueError(f"Invalid codec: {name}. Must be one of {tuple(CODECS)}")
+
+
+def validate_topk_ratio(ratio: float) -> None:
+    if not 0 < ratio <= 1:
+        raise ValueError(f"The top-k ratio must be in (0, 1], got {ratio}.")
+
+
+def get_codec(name: str, topk_ratio: float = 1.0, delta: bool = False) -> Codec:
+    validate_codec(name)
+    if name == TopKCodec.name:
+        return TopKCodec(topk_ratio, delta)
+    return CODECS[name](delta)
+
+
+def codec_from_tensor_type(tensor_type: str) -> Codec | None:
+    if tensor_type == TENSOR_TYPE or not tensor_type.startswith(
+        CODEC_TENSOR_TYPE_PREFIX
+    ):
+        return None
+    name = tensor_type[len(CODEC_TENSOR_TYPE_PREFIX) :]
+    if name.startswith(DELTA_TENSOR_TYPE_PREFIX):
+        return get_codec(name[len(DELTA_TENSOR_TYPE_PREFIX) :], delta=True)
+    return get_codec(name)
+
+
+def xor_arrays(arrays: list[np.ndarray], base: list[np.ndarray]) -> list[np.ndarray]:
+    if len(arrays) != len(base):
+        raise ValueError(f"Expected {len(base)} arrays, got {len(arrays)} arrays.")
+
+    result = []
+    for array, base_array in zip(arrays, base):
+        if array.shape != base_array.shape or array.dtype != base_array.dtype:
+            raise ValueError(
+                f"Cannot XOR an array of shape {array.shape} ({array.dtype}) with "
+                f"a base of shape {base_array.shape} ({base_array.dtype})."
+            )
+
+        bits = np.dtype(f"u{array.dtype.itemsize}")
+        result.append(
+            np.bitwise_xor(
+                np.ascontiguousarray(array).view(bits),
+                np.ascontiguousarray(base_array).view(bits),
+            ).view(array.dtype)
+        )
+
+    return result
+
+
+def arrays_size(arrays: list[np.ndarray]) -> int:
+    return sum(array.nbytes for array in arrays)
+
+
+def parameters_size(parameters: Parameters) -> int:
+    return sum(len(tensor) for tensor in parameters.tensors)
+
+
+def relative_error(
+    arrays: list[np.ndarray],
+    decoded: list[np.ndarray],
+    reference: list[np.ndarray] | None = None,
+) -> float:
+    error = sum(
+        float(np.sum(np.square(a.astype(np.float64) - d)))
+        for a, d in zip(arrays, decoded)
+    )
+    norm = sum(
+        float(np.sum(np.square(a.astype(np.float64))))
+        for a in (arrays if reference is None else reference)
+    )
+    return float(np.sqrt(error / norm)) if norm > 0 else 0.0
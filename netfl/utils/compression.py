@@ -0,0 +1,168 @@
+import io
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+from flwr.common import Parameters
+
+from netfl.utils.weights import ndarray_to_bytes
+
+
+COMPRESSION_SEPARATOR = "+"
+
+
+class Compressor(ABC):
+    name: str
+    default_level: int
+
+    def __init__(self, level: int | None = None) -> None:
+        self.level = self.default_level if level is None else level
+
+    @abstractmethod
+    def compress(self, data: bytes | memoryview | np.ndarray) -> bytes:
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        pass
+
+
+class ZlibCompressor(Compressor):
+    name = "zlib"
+    default_level = 1
+
+    def compress(self, data: bytes | memoryview | np.ndarray) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    name = "zstd"
+    default_level = 3
+
+    def __init__(self, level: int | None = None) -> None:
+        super().__init__(level)
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError(
+                "The zstd compression requires zstandard, install it with "
+                "'pip install netfl[compression]'."
+            ) from e
+
+        self._compressor = zstandard.ZstdCompressor(level=self.level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes | memoryview | np.ndarray) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    name = "lz4"
+    default_level = 0
+
+    def __init__(self, level: int | None = None) -> None:
+        super().__init__(level)
+        try:
+            import lz4.frame
+        except ImportError as e:
+            raise RuntimeError(
+                "The lz4 compression requires lz4, install it with "
+                "'pip install netfl[compression]'."
+            ) from e
+
+        self._frame = lz4.frame
+
+    def compress(self, data: bytes | memoryview | np.ndarray) -> bytes:
+        return self._frame.compress(data, compression_level=self.level)
+
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        return self._frame.decompress(data)
+
+
+COMPRESSORS: dict[str, type[Compressor]] = {
+    compressor.name: compressor
+    for compressor in (ZlibCompressor, ZstdCompressor, Lz4Compressor)
+}
+
+
+def validate_compression(name: str) -> None:
+    if name not in COMPRESSORS:
+        raise ValueError(
+            f"Invalid compression: {name}. Must be one of {tuple(COMPRESSORS)}"
+        )
+
+
+def get_compressor(name: str, level: int | None = None) -> Compressor:
+    validate_compression(name)
+    return COMPRESSORS[name](level)
+
+
+def shuffle_bytes(array: np.ndarray) -> np.ndarray:
+    itemsize = array.dtype.itemsize
+    data = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+    if itemsize == 1:
+        return data
+    return np.ascontiguousarray(data.reshape(-1, itemsize).T)
+
+
+def unshuffle_bytes(data: bytes, dtype: np.dtype, shape: tuple[int, ...]) -> np.ndarray:
+    planes = np.frombuffer(data, dtype=np.uint8)
+    if dtype.itemsize > 1:
+        planes = np.ascontiguousarray(planes.reshape(dtype.itemsize, -1).T)
+    return planes.view(dtype).reshape(shape)
+
+
+def read_tensor_header(tensor: bytes) -> tuple[np.dtype, tuple[int, ...], int]:
+    f = io.BytesIO(tensor)
+    version = np.lib.format.read_magic(f)
+
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+    if fortran_order:
+        raise ValueError("Fortran-ordered tensors are not supported.")
+
+    return dtype, shape, f.tell()
+
+
+def compress_tensor(tensor: bytes, compressor: Compressor) -> bytes:
+    dtype, shape, offset = read_tensor_header(tensor)
+    array = np.frombuffer(tensor, dtype=dtype, count=int(np.prod(shape)), offset=offset)
+    return b"".join((tensor[:offset], compressor.compress(shuffle_bytes(array))))
+
+
+def decompress_tensor(tensor: bytes, compressor: Compressor) -> bytes:
+    dtype, shape, offset = read_tensor_header(tensor)
+    data = compressor.decompress(memoryview(tensor)[offset:])
+    return ndarray_to_bytes(unshuffle_bytes(data, dtype, shape))
+
+
+def compress_parameters(parameters: Parameters, compressor: Compressor) -> Parameters:
+    return Parameters(
+        tensors=[compress_tensor(tensor, compressor) for tensor in parameters.tensors],
+        tensor_type=f"{parameters.tensor_type}{COMPRESSION_SEPARATOR}{compressor.name}",
+    )
+
+
+def decompress_parameters(parameters: Parameters) -> Parameters:
+    tensor_type, separator, name = parameters.tensor_type.rpartition(
+        COMPRESSION_SEPARATOR
+    )
+    if not separator:
+        return parameters
+
+    compressor = get_compressor(name)
+    return Parameters(
+        tensors=[
+            decompress_tensor(tensor, compressor) for tensor in parameters.tensors
+        ],
+        tensor_type=tensor_type,
+    )
@@ -0,0 +1,254 @@
+import os
+import json
+import hashlib
+from typing import Any, Literal
+
+import numpy as np
+import pyarrow as pa
+import datasets
+
+
+SHARDS_DIR = "shards"
+CACHE_DIR = "cache"
+SNAPSHOTS_DIR = os.path.join(CACHE_DIR, "snapshots")
+SHARD_WRITE_BATCH_SIZE = 1024
+
+LocalFormat = Literal["parquet", "arrow", "npz", "imagefolder"]
+LOCAL_FORMATS = ("parquet", "arrow", "npz", "imagefolder")
+
+CacheMode = Literal["memory", "disk"]
+CACHE_MODES = ("memory", "disk")
+
+
+def cache_key(**parts: Any) -> str:
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def shard_name(partition_id: int) -> str:
+    return f"partition_{partition_id}"
+
+
+def shard_files(name: str, directory: str = SHARDS_DIR) -> tuple[str, str]:
+    return (
+        os.path.join(directory, f"{name}_x.npy"),
+        os.path.join(directory, f"{name}_y.npy"),
+    )
+
+
+def has_shard(name: str, directory: str = SHARDS_DIR) -> bool:
+    return all(os.path.isfile(path) for path in shard_files(name, directory))
+
+
+def write_column(
+    dataset: datasets.Dataset,
+    key: str,
+    path: str,
+    batch_size: int = SHARD_WRITE_BATCH_SIZE,
+) -> None:
+    length = dataset.num_rows
+    if length == 0:
+        raise ValueError(f"Cannot write an empty column '{key}' to '{path}'.")
+
+    column = dataset.select_columns(key).with_format("numpy")
+    first = np.asarray(column[0:1][key])
+    tmp_path = f"{path}.tmp"
+
+    array = np.lib.format.open_memmap(
+        tmp_path, mode="w+", dtype=first.dtype, shape=(length, *first.shape[1:])
+    )
+    for start in range(0, length, batch_size):
+        end = min(start + batch_size, length)
+        array[start:end] = column[start:end][key]
+    array.flush()
+    del array
+
+    os.replace(tmp_path, path)
+
+
+def write_shard(
+    dataset: datasets.Dataset,
+    input_key: str,
+    label_key: str,
+    name: str,
+    directory: str = SHARDS_DIR,
+) -> None:
+    os.makedirs(directory, exist_ok=True)
+    x_path, y_path = shard_files(name, directory)
+
+    write_column(dataset, input_key, x_path)
+    write_column(dataset, label_key, y_path)
+
+
+def load_shard(
+    name: str, directory: str = SHARDS_DIR, memory_map: bool = False
+) -> tuple[np.ndarray, np.ndarray]:
+    x_path, y_path = shard_files(name, directory)
+
+    for path in (x_path, y_path):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Shard file '{path}' does not exist.")
+
+    mmap_mode = "r" if memory_map else None
+    return np.load(x_path, mmap_mode=mmap_mode), np.load(y_path, mmap_mode=mmap_mode)
+
+
+def column_array(dataset: datasets.Dataset, key: str) -> np.ndarray:
+    return dataset.with_format("numpy", columns=[key])[key]
+
+
+def stratified_indices(labels: np.ndarray, size: int, seed: int) -> np.ndarray:
+    length = len(labels)
+    if size >= length:
+        return np.arange(length)
+
+    classes, inverse, counts = np.unique(
+        np.asarray(labels), return_inverse=True, return_counts=True
+    )
+    quotas = counts * size / length
+    allocation = np.floor(quotas).astype(np.int64)
+    remainder = size - int(allocation.sum())
+    allocation[np.argsort(allocation - quotas, kind="stable")[:remainder]] += 1
+
+    rng = np.random.default_rng(seed)
+    grouped = np.argsort(inverse.reshape(-1), kind="stable")
+    starts = np.cumsum(counts) - counts
+
+    selected = [
+        rng.choice(grouped[start : start + count], k, replace=False)
+        for start, count, k in zip(starts, counts, allocation)
+    ]
+
+    return np.sort(np.concatenate(selected))
+
+
+class DatasetColumn:
+    def __init__(self, dataset: datasets.Dataset, key: str) -> None:
+        if dataset.num_rows == 0:
+            raise ValueError(f"Cannot read an empty column '{key}'.")
+
+        self._dataset = dataset.select_columns(key).with_format("numpy")
+        self._key = key
+
+        first = np.asarray(self._dataset[0:1][key])
+        self.shape = (dataset.num_rows, *first.shape[1:])
+        self.dtype = first.dtype
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, indices: np.ndarray) -> np.ndarray:
+        return np.asarray(self._dataset[indices][self._key], dtype=self.dtype)
+
+
+def validate_local_format(local_format: str) -> None:
+    if local_format not in LOCAL_FORMATS:
+        raise ValueError(
+            f"Invalid local_format: {local_format}. Must be one of {LOCAL_FORMATS}"
+        )
+
+
+def local_split_files(path: str, extension: str) -> dict[str, str]:
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"Local dataset directory '{path}' does not exist.")
+
+    split_files = {
+        filename[: -len(extension) - 1]: os.path.join(path, filename)
+        for filename in sorted(os.listdir(path))
+        if filename.endswith(f".{extension}")
+    }
+
+    if not split_files:
+        raise FileNotFoundError(
+            f"No '.{extension}' split files found in local dataset directory '{path}'."
+        )
+
+    return split_files
+
+
+def npz_to_parquet(npz_file: str, parquet_file: str) -> None:
+    with np.load(npz_file) as arrays:
+        columns = {key: arrays[key] for key in arrays.files}
+
+    features = {}
+    for key, array in columns.items():
+        if array.ndim == 1:
+            features[key] = datasets.Value(str(array.dtype))
+        elif array.ndim <= 5:
+            array_feature = getattr(datasets, f"Array{array.ndim - 1}D")
+            features[key] = array_feature(shape=array.shape[1:], dtype=str(array.dtype))
+        else:
+            raise ValueError(
+                f"Column '{key}' of '{npz_file}' has {array.ndim} dimensions, "
+                f"at most 5 are supported."
+            )
+
+    os.makedirs(os.path.dirname(parquet_file), exist_ok=True)
+    datasets.Dataset.from_dict(
+        columns, features=datasets.Features(features)
+    ).to_parquet(f"{parquet_file}.tmp")
+    os.replace(f"{parquet_file}.tmp", parquet_file)
+
+
+def local_dataset_source(path: str, local_format: str) -> dict[str, Any]:
+    validate_local_format(local_format)
+
+    if local_format == "imagefolder":
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Local dataset directory '{path}' does not exist.")
+        return {"dataset": "imagefolder", "data_dir": path}
+
+    if local_format == "npz":
+        cache_dir = os.path.join(
+            CACHE_DIR, "npz", os.path.basename(os.path.normpath(path))
+        )
+        split_files = {}
+        for split, npz_file in local_split_files(path, "npz").items():
+            parquet_file = os.path.join(cache_dir, f"{split}.parquet")
+            if not os.path.isfile(parquet_file) or os.path.getmtime(
+                parquet_file
+            ) < os.path.getmtime(npz_file):
+                npz_to_parquet(npz_file, parquet_file)
+            split_files[split] = parquet_file
+        return {"dataset": "parquet", "data_files": split_files}
+
+    return {
+        "dataset": local_format,
+        "data_files": local_split_files(path, local_format),
+    }
+
+
+def save_local_dataset(
+    dataset: datasets.DatasetDict,
+    path: str,
+    local_format: str,
+    input_key: str,
+    label_key: str,
+) -> None:
+    validate_local_format(local_format)
+
+    if local_format == "imagefolder":
+        raise ValueError(
+            "The imagefolder format can only be used as a source, "
+            "prepare the dataset as parquet, arrow or npz instead."
+        )
+
+    os.makedirs(path, exist_ok=True)
+
+    for split, split_dataset in dataset.items():
+        split_file = os.path.join(path, f"{split}.{local_format}")
+
+        if local_format == "parquet":
+            split_dataset.to_parquet(split_file)
+        elif local_format == "arrow":
+            table = split_dataset.with_format("arrow")[:]
+            with pa.OSFile(split_file, "wb") as sink:
+                with pa.ipc.new_stream(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            columns = split_dataset.select_columns([input_key, label_key])
+            columns = columns.with_format("numpy")
+            np.savez(
+                split_file,
+                **{input_key: columns[input_key], label_key: columns[label_key]},
+            )
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+
+import numpy as np
+from keras import models
+
+from netfl.utils.weights import bytes_to_ndarray_view
+
+
+@dataclass
+class FlatLayout:
+    shapes: list[tuple[int, ...]]
+    offsets: np.ndarray
+
+    @classmethod
+    def from_shapes(cls, shapes: list[tuple[int, ...]]) -> "FlatLayout":
+        sizes = [int(np.prod(shape)) for shape in shapes]
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        return cls(list(shapes), offsets)
+
+    @classmethod
+    def from_model(cls, model: models.Model) -> "FlatLayout":
+        return cls.from_shapes([tuple(variable.shape) for variable in model.weights])
+
+    @classmethod
+    def from_arrays(cls, arrays: list[np.ndarray]) -> "FlatLayout":
+        return cls.from_shapes([array.shape for array in arrays])
+
+    @property
+    def size(self) -> int:
+        return int(self.offsets[-1])
+
+    def views(self, vector: np.ndarray) -> list[np.ndarray]:
+        return [
+            vector[start:end].reshape(shape)
+            for start, end, shape in zip(
+                self.offsets[:-1], self.offsets[1:], self.shapes
+            )
+        ]
+
+    def flat_views(self, tensors: list[bytes]) -> list[np.ndarray]:
+        if len(tensors) != len(self.shapes):
+            raise ValueError(
+                f"The layout has {len(self.shapes)} arrays, got {len(tensors)} arrays."
+            )
+
+        views = []
+        for tensor, shape in zip(tensors, self.shapes):
+            array = bytes_to_ndarray_view(tensor)
+            if array.shape != shape:
+                raise ValueError(
+                    f"Expected an array of shape {shape}, got {array.shape}."
+                )
+            views.append(array.reshape(-1))
+
+        return views
+
+    def chunks(self, chunk_size: int) -> list[tuple[int, int, int]]:
+        return [
+            (layer, start, min(start + chunk_size, int(end - offset)))
+            for layer, (offset, end) in enumerate(
+                zip(self.offsets[:-1], self.offsets[1:])
+            )
+            for start in range(0, int(end - offset), chunk_size)
+        ]
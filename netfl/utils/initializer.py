@@ -9,7 +9,8 @@ from dataclasses import dataclass
 from netfl.core.task import Task
 from netfl.core.server import Server
 from netfl.core.client import Client
-from netfl.utils.net import serve_file, download_file
+from netfl.utils.net import serve_files, download_file
+from netfl.utils.dataset import SHARDS_DIR, shard_name, shard_files
 
 
 EXPERIMENT_ENV_VAR = "NETFL_EXPERIMENT"
@@ -19,12 +20,14 @@ TASK_FILE = "task.py"
 class AppType(Enum):
     CLIENT = "client"
     SERVER = "server"
+    PREPARE = "prepare"
+    STATISTICS = "statistics"
 
 
 @dataclass
 class Args:
     type: AppType
-    server_port: int
+    server_port: int | None
     server_address: str | None
     client_id: int | None
     client_name: str | None
@@ -76,13 +79,12 @@ def get_args():
         "--type",
         type=valid_app_type,
         required=True,
-        help="Type of application: client or server",
+        help="Type of application: client, server, prepare or statistics",
     )
     parser.add_argument(
         "--server_port",
         type=valid_port,
-        required=True,
-        help="Server port number (1-65535)",
+        help="Server port number (1-65535) (required for client and server types)",
     )
     parser.add_argument(
         "--server_address",
@@ -100,8 +102,17 @@ def get_args():
     return parser.parse_args()
 
 
+def validate_server_args(args) -> None:
+    if args.server_port is None:
+        raise argparse.ArgumentError(
+            None, "Missing required arguments for server type: --server_port."
+        )
+
+
 def validate_client_args(args) -> None:
     missing_args = []
+    if args.server_port is None:
+        missing_args.append("--server_port")
     if args.server_address is None:
         missing_args.append("--server_address")
     if args.client_id is None:
@@ -116,11 +127,28 @@ def validate_client_args(args) -> None:
         )
 
 
-def serve_task_file() -> None:
-    http_thread = threading.Thread(target=serve_file, args=(TASK_FILE,), daemon=True)
+def write_task_shards(task: Task) -> None:
+    if task.train_configs().shard_data:
+        task.write_shards(SHARDS_DIR)
+
+
+def serve_task_files(task: Task) -> None:
+    paths = [TASK_FILE]
+    if task.train_configs().shard_data:
+        paths.append(SHARDS_DIR)
+
+    http_thread = threading.Thread(target=serve_files, args=(paths,), daemon=True)
     http_thread.start()
 
 
+def prepare_task_dataset(task: Task) -> None:
+    task.prepare_dataset()
+
+
+def write_task_partition_statistics(task: Task) -> None:
+    task.partition_statistics()
+
+
 def start_server(args, task: Task) -> None:
     server = Server(task)
     server.start(server_port=args.server_port)
@@ -130,6 +158,12 @@ def download_task_file(server_address: str) -> None:
     download_file(TASK_FILE, address=server_address)
 
 
+def download_task_shard(server_address: str, client_id: int, task: Task) -> None:
+    if task.train_configs().shard_data:
+        for shard_file in shard_files(shard_name(client_id), SHARDS_DIR):
+            download_file(shard_file, address=server_address)
+
+
 def validate_task_dir(task_dir: str) -> None:
     try:
         if not os.path.isdir(task_dir):
@@ -2,6 +2,10 @@ import time
 import threading
 import os
 
+from keras import callbacks
+
+from netfl.utils.log import log
+
 
 class ResourceSampler:
     def __init__(self, interval: float = 0.1) -> None:
@@ -107,3 +111,56 @@ class ResourceSampler:
             return os.cpu_count() or 1
         except Exception:
             return 1
+
+
+class EpochSampler(callbacks.Callback):
+    def __init__(self) -> None:
+        super().__init__()
+        self._epoch_start_time = 0.0
+        self._first_batch_time: float | None = None
+        self._first_batch_times: list[float] = []
+        self._rss_mb: list[float] = []
+
+    def reset(self) -> None:
+        self._first_batch_times = []
+        self._rss_mb = []
+
+    def on_epoch_begin(self, epoch, logs=None) -> None:
+        self._epoch_start_time = time.perf_counter()
+        self._first_batch_time = None
+
+    def on_train_batch_end(self, batch, logs=None) -> None:
+        if self._first_batch_time is None:
+            self._first_batch_time = time.perf_counter() - self._epoch_start_time
+
+    def on_epoch_end(self, epoch, logs=None) -> None:
+        first_batch_time = self._first_batch_time or 0.0
+        rss = self._read_rss()
+        rss_mb = rss / (1024**2) if rss is not None else 0.0
+
+        self._first_batch_times.append(first_batch_time)
+        self._rss_mb.append(rss_mb)
+
+        log(
+            f"[EPOCH {epoch + 1}] first_batch_time={first_batch_time:.6f}s, "
+            f"rss={rss_mb:.2f}MB"
+        )
+
+    def summary(self) -> tuple[float, float]:
+        first_batch_time_avg = (
+            sum(self._first_batch_times) / len(self._first_batch_times)
+            if self._first_batch_times
+            else 0.0
+        )
+        rss_max_mb = max(self._rss_mb, default=0.0)
+
+        return round(first_batch_time_avg, 6), round(rss_max_mb, 6)
+
+    @staticmethod
+    def _read_rss() -> int | None:
+        try:
+            with open("/proc/self/statm", "r") as f:
+                resident_pages = int(f.read().split()[1])
+            return resident_pages * os.sysconf("SC_PAGE_SIZE")
+        except Exception:
+            return None
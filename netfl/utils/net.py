@@ -15,26 +15,37 @@ DEFAULT_RETRY_TIMEOUT = 60
 DEFAULT_MAX_RETRIES = 30
 
 
-def serve_file(filename: str, port: int = DEFAULT_FILE_SERVER_PORT) -> None:
+def serve_files(paths: list[str], port: int = DEFAULT_FILE_SERVER_PORT) -> None:
+    def is_served(path: str) -> bool:
+        if not os.path.isfile(path):
+            return False
+        for served_path in paths:
+            if path == served_path:
+                return True
+            if os.path.isdir(served_path) and path.startswith(f"{served_path}/"):
+                return True
+        return False
+
     class FileServer(SimpleHTTPRequestHandler):
         def do_GET(self):
-            if self.path == f"/{filename}":
-                self.path = filename
+            path = os.path.normpath(self.path.lstrip("/"))
+            if not path.startswith("..") and is_served(path):
+                self.path = path
                 return super().do_GET()
             self.send_error(404, "File not found")
 
         def log_message(self, format, *args):
             pass
 
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f"File '{filename}' does not exist.")
+    paths = [os.path.normpath(path) for path in paths]
 
-    if not os.path.isfile(filename):
-        raise ValueError(f"'{filename}' is not a file.")
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Path '{path}' does not exist.")
 
     server_address = ("", port)
     httpd = HTTPServer(server_address, FileServer)
-    log(f"Serving file {filename} on port {port}")
+    log(f"Serving {', '.join(paths)} on port {port}")
     httpd.serve_forever()
 
 
@@ -46,6 +57,7 @@ def download_file(
 
     try:
         log(f"Downloading file {filename} from {url}")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
         request.urlretrieve(url, file_path)
         log(f"File downloaded successfully to {file_path}")
     except Exception as e:
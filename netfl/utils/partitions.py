@@ -0,0 +1,602 @@
+import os
+import csv
+import json
+from abc import abstractmethod
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import numpy as np
+import datasets
+from flwr_datasets import partitioner
+
+from netfl.utils.dataset import CACHE_DIR, cache_key, column_array
+
+
+PARTITIONS_DIR = os.path.join(CACHE_DIR, "partitions")
+PARTITION_STATISTICS_DIR = "partition_statistics"
+ROW_INDEX_COLUMN = "__netfl_row_index__"
+
+
+@dataclass
+class PartitionIndex:
+    offsets: np.ndarray
+    indices: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def partition(self, partition_id: int) -> np.ndarray:
+        if not 0 <= partition_id < len(self):
+            raise ValueError(
+                f"The partition_id must be in [0, {len(self)}), got {partition_id}."
+            )
+
+        return self.indices[self.offsets[partition_id] : self.offsets[partition_id + 1]]
+
+    def sizes(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @staticmethod
+    def index_dtype(num_rows: int) -> type[np.integer]:
+        return np.int32 if num_rows <= np.iinfo(np.int32).max else np.int64
+
+    @classmethod
+    def from_partitions(
+        cls, partitions: list[Any], num_rows: int | None = None
+    ) -> "PartitionIndex":
+        sizes = np.fromiter((len(p) for p in partitions), dtype=np.int64)
+        offsets = np.zeros(len(partitions) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+
+        if num_rows is None:
+            num_rows = max(
+                (int(np.max(p)) + 1 for p in partitions if len(p)), default=0
+            )
+
+        indices = np.empty(offsets[-1], dtype=cls.index_dtype(num_rows))
+        for partition_id, partition in enumerate(partitions):
+            indices[offsets[partition_id] : offsets[partition_id + 1]] = partition
+
+        return cls(offsets, indices)
+
+    @staticmethod
+    def files(path: str) -> tuple[str, str]:
+        return f"{path}_offsets.npy", f"{path}_indices.npy"
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        return all(os.path.isfile(file) for file in cls.files(path))
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        for file, array in zip(self.files(path), (self.offsets, self.indices)):
+            with open(f"{file}.tmp", "wb") as f:
+                np.save(f, array)
+            os.replace(f"{file}.tmp", file)
+
+    @classmethod
+    def load(cls, path: str, memory_map: bool = True) -> "PartitionIndex":
+        offsets_file, indices_file = cls.files(path)
+        mmap_mode = "r" if memory_map else None
+
+        return cls(
+            np.load(offsets_file, mmap_mode=mmap_mode),
+            np.load(indices_file, mmap_mode=mmap_mode),
+        )
+
+
+class IndexedPartitioner(partitioner.Partitioner):
+    def __init__(self) -> None:
+        super().__init__()
+        self._partition_index: PartitionIndex | None = None
+
+    @property
+    def partition_index(self) -> PartitionIndex:
+        if self._partition_index is None:
+            self._partition_index = self._compute_partition_index()
+        return self._partition_index
+
+    @abstractmethod
+    def _compute_partition_index(self) -> PartitionIndex:
+        pass
+
+    def load_partition(self, partition_id: int) -> datasets.Dataset:
+        return self.dataset.select(self.partition_index.partition(partition_id))
+
+    @property
+    def num_partitions(self) -> int:
+        return len(self.partition_index)
+
+
+@dataclass
+class PartitionStatistics:
+    labels: list[Any]
+    histogram: np.ndarray
+    num_rows: int
+
+    def sizes(self) -> np.ndarray:
+        return self.histogram.sum(axis=1)
+
+    def summary(self) -> dict[str, Any]:
+        sizes = self.sizes()
+        num_classes = len(self.labels)
+        non_empty = sizes > 0
+
+        global_distribution = self.histogram.sum(axis=0) / max(sizes.sum(), 1)
+        distributions = self.histogram[non_empty] / sizes[non_empty, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entropy = -np.sum(
+                np.where(distributions > 0, distributions * np.log(distributions), 0.0),
+                axis=1,
+            )
+        normalized_entropy = (
+            entropy / np.log(num_classes) if num_classes > 1 else entropy
+        )
+        tv_distance = 0.5 * np.abs(distributions - global_distribution).sum(axis=1)
+
+        def mean(values: np.ndarray) -> float:
+            return round(float(values.mean()), 6) if len(values) else 0.0
+
+        return {
+            "num_partitions": len(sizes),
+            "num_classes": num_classes,
+            "num_samples": int(sizes.sum()),
+            "unassigned_samples": int(self.num_rows - sizes.sum()),
+            "empty_partitions": int((~non_empty).sum()),
+            "size_min": int(sizes.min()),
+            "size_max": int(sizes.max()),
+            "size_mean": round(float(sizes.mean()), 6),
+            "size_std": round(float(sizes.std()), 6),
+            "size_cv": (
+                round(float(sizes.std() / sizes.mean()), 6) if sizes.mean() else 0.0
+            ),
+            "classes_per_partition_mean": mean((self.histogram > 0).sum(axis=1)),
+            "label_entropy_mean": mean(normalized_entropy),
+            "label_tv_distance_mean": mean(tv_distance),
+        }
+
+
+def partition_statistics(
+    partition_index: PartitionIndex, labels: np.ndarray
+) -> PartitionStatistics:
+    unique_labels, label_ids = np.unique(labels, return_inverse=True)
+    num_classes = len(unique_labels)
+    partition_ids = np.repeat(
+        np.arange(len(partition_index), dtype=np.int64), partition_index.sizes()
+    )
+
+    histogram = np.bincount(
+        partition_ids * num_classes + label_ids.reshape(-1)[partition_index.indices],
+        minlength=len(partition_index) * num_classes,
+    ).reshape(len(partition_index), num_classes)
+
+    return PartitionStatistics(unique_labels.tolist(), histogram, len(labels))
+
+
+def write_partition_statistics(
+    statistics: PartitionStatistics,
+    directory: str = PARTITION_STATISTICS_DIR,
+    heatmap: bool = True,
+) -> None:
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "summary.json"), "w") as f:
+        json.dump(
+            {
+                **statistics.summary(),
+                "labels": statistics.labels,
+                "sizes": statistics.sizes().tolist(),
+            },
+            f,
+            indent=2,
+            default=str,
+        )
+
+    with open(os.path.join(directory, "histogram.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["partition_id", "size", *statistics.labels])
+        for partition_id, (size, counts) in enumerate(
+            zip(statistics.sizes(), statistics.histogram)
+        ):
+            writer.writerow([partition_id, size, *counts])
+
+    if heatmap:
+        write_partition_heatmap(statistics, os.path.join(directory, "heatmap.png"))
+
+
+def write_partition_heatmap(statistics: PartitionStatistics, path: str) -> None:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError as e:
+        raise RuntimeError(
+            "The partition heatmap requires matplotlib, install it with "
+            "'pip install matplotlib'."
+        ) from e
+
+    num_partitions, num_classes = statistics.histogram.shape
+    figure, axes = plt.subplots(
+        figsize=(min(2 + 0.4 * num_partitions, 16), min(2 + 0.4 * num_classes, 10))
+    )
+    image = axes.imshow(
+        statistics.histogram.T, aspect="auto", interpolation="nearest", cmap="viridis"
+    )
+    figure.colorbar(image, ax=axes, label="Samples")
+    axes.set_xlabel("Partition")
+    axes.set_ylabel("Label")
+    if num_classes <= 50:
+        axes.set_yticks(range(num_classes), [str(label) for label in statistics.labels])
+    figure.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
+
+
+def group_by_label(
+    labels: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    unique_labels, label_ids, label_counts = np.unique(
+        labels, return_inverse=True, return_counts=True
+    )
+    label_offsets = np.zeros(len(unique_labels) + 1, dtype=np.int64)
+    np.cumsum(label_counts, out=label_offsets[1:])
+    label_to_indices = np.argsort(label_ids.reshape(-1), kind="stable").astype(
+        PartitionIndex.index_dtype(len(labels))
+    )
+
+    return unique_labels, label_counts, label_offsets, label_to_indices
+
+
+def assemble_partition_index(
+    source: np.ndarray,
+    starts: np.ndarray,
+    sizes: np.ndarray,
+    partition_ids: np.ndarray,
+    num_partitions: int,
+) -> PartitionIndex:
+    offsets = np.zeros(num_partitions + 1, dtype=np.int64)
+    np.cumsum(
+        np.bincount(partition_ids, weights=sizes, minlength=num_partitions).astype(
+            np.int64
+        ),
+        out=offsets[1:],
+    )
+    range_offsets = np.cumsum(sizes) - sizes
+    positions = np.repeat(starts - range_offsets, sizes) + np.arange(offsets[-1])
+
+    return PartitionIndex(offsets, source[positions])
+
+
+def shuffle_partitions(
+    partition_index: PartitionIndex, rng: np.random.Generator
+) -> None:
+    offsets = partition_index.offsets
+    for partition_id in range(len(partition_index)):
+        rng.shuffle(
+            partition_index.indices[offsets[partition_id] : offsets[partition_id + 1]]
+        )
+
+
+def contiguous_partition_index(num_rows: int, num_partitions: int) -> PartitionIndex:
+    size, remainder = divmod(num_rows, num_partitions)
+    sizes = np.full(num_partitions, size, dtype=np.int64)
+    sizes[:remainder] += 1
+
+    offsets = np.zeros(num_partitions + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+
+    return PartitionIndex(
+        offsets, np.arange(num_rows, dtype=PartitionIndex.index_dtype(num_rows))
+    )
+
+
+def compute_partition_index(
+    dataset_partitioner: partitioner.Partitioner,
+    dataset: datasets.Dataset,
+    input_key: str | None = None,
+) -> PartitionIndex:
+    if isinstance(dataset_partitioner, IndexedPartitioner):
+        dataset_partitioner.dataset = dataset
+        return dataset_partitioner.partition_index
+
+    if isinstance(dataset_partitioner, partitioner.IidPartitioner):
+        return contiguous_partition_index(
+            dataset.num_rows, dataset_partitioner.num_partitions
+        )
+
+    if input_key is not None:
+        dataset = dataset.remove_columns(input_key)
+
+    dataset_partitioner.dataset = dataset.add_column(
+        ROW_INDEX_COLUMN, np.arange(dataset.num_rows)
+    )
+    return PartitionIndex.from_partitions(
+        [
+            column_array(dataset_partitioner.load_partition(i), ROW_INDEX_COLUMN)
+            for i in range(dataset_partitioner.num_partitions)
+        ],
+        dataset.num_rows,
+    )
+
+
+class CachedPartitioner(IndexedPartitioner):
+    def __init__(
+        self,
+        dataset_partitioner: partitioner.Partitioner,
+        configs: dict[str, Any],
+        input_key: str | None = None,
+        directory: str = PARTITIONS_DIR,
+    ) -> None:
+        super().__init__()
+        self._partitioner = dataset_partitioner
+        self._configs = configs
+        self._input_key = input_key
+        self._directory = directory
+
+    def _compute_partition_index(self) -> PartitionIndex:
+        path = os.path.join(
+            self._directory,
+            cache_key(
+                fingerprint=self.dataset._fingerprint,
+                num_rows=self.dataset.num_rows,
+                dataset_partitioner=self._configs,
+            ),
+        )
+
+        if PartitionIndex.exists(path):
+            return PartitionIndex.load(path)
+
+        partition_index = compute_partition_index(
+            self._partitioner, self.dataset, self._input_key
+        )
+        partition_index.save(path)
+
+        return PartitionIndex.load(path)
+
+
+class NativeDirichletPartitioner(IndexedPartitioner):
+    def __init__(
+        self,
+        num_partitions: int,
+        partition_by: str,
+        alpha: float,
+        min_partition_size: int = 0,
+        self_balancing: bool = True,
+        shuffle: bool = True,
+        seed: int | None = 42,
+    ) -> None:
+        super().__init__()
+        if num_partitions <= 0:
+            raise ValueError("The number of partitions must be greater than zero.")
+        if alpha <= 0:
+            raise ValueError(f"alpha must be positive, got {alpha}")
+        if min_partition_size < 0:
+            raise ValueError(
+                f"min_partition_size must be non-negative, got {min_partition_size}"
+            )
+
+        self._num_partitions = num_partitions
+        self._partition_by = partition_by
+        self._alpha = alpha
+        self._min_partition_size = min_partition_size
+        self._self_balancing = self_balancing
+        self._shuffle = shuffle
+        self._rng = np.random.default_rng(seed)
+
+    def _compute_partition_index(self) -> PartitionIndex:
+        if self._num_partitions * self._min_partition_size > self.dataset.num_rows:
+            raise ValueError(
+                f"The dataset has {self.dataset.num_rows} samples, not enough for "
+                f"{self._num_partitions} partitions of at least "
+                f"{self._min_partition_size} samples."
+            )
+
+        labels = column_array(self.dataset, self._partition_by)
+        _, label_counts, label_offsets, label_to_indices = group_by_label(labels)
+
+        counts = self._sample_counts(label_counts)
+        self._repair_counts(counts)
+
+        starts = label_offsets[:-1, None] + np.cumsum(counts, axis=1) - counts
+        partition_ids, label_ids = np.nonzero(counts.T)
+        partition_index = assemble_partition_index(
+            label_to_indices,
+            starts[label_ids, partition_ids],
+            counts[label_ids, partition_ids],
+            partition_ids,
+            self._num_partitions,
+        )
+
+        if self._shuffle:
+            shuffle_partitions(partition_index, self._rng)
+
+        return partition_index
+
+    def _sample_counts(self, label_counts: np.ndarray) -> np.ndarray:
+        proportions = self._rng.gamma(
+            self._alpha, size=(len(label_counts), self._num_partitions)
+        )
+        proportions[proportions.sum(axis=1) == 0] = 1.0
+
+        if not self._self_balancing:
+            return self._split_counts(proportions, label_counts)
+
+        counts = np.zeros_like(proportions, dtype=np.int64)
+        sizes = np.zeros(self._num_partitions, dtype=np.int64)
+        average_size = label_counts.sum() / self._num_partitions
+
+        for label_id, label_proportions in enumerate(proportions):
+            balanced = np.where(sizes > average_size, 0.0, label_proportions)
+            if balanced.sum() == 0:
+                balanced = label_proportions
+            counts[label_id] = self._split_counts(
+                balanced[None], label_counts[label_id : label_id + 1]
+            )[0]
+            sizes += counts[label_id]
+
+        return counts
+
+    @staticmethod
+    def _split_counts(proportions: np.ndarray, label_counts: np.ndarray) -> np.ndarray:
+        fractions = np.cumsum(proportions, axis=1)
+        fractions /= fractions[:, -1:]
+        bounds = (fractions * label_counts[:, None]).astype(np.int64)
+        bounds[:, -1] = label_counts
+
+        return np.diff(bounds, axis=1, prepend=0)
+
+    def _repair_counts(self, counts: np.ndarray) -> None:
+        sizes = counts.sum(axis=0)
+
+        for partition_id in np.flatnonzero(sizes < self._min_partition_size):
+            while sizes[partition_id] < self._min_partition_size:
+                donor_id = np.argmax(sizes)
+                label_id = np.argmax(counts[:, donor_id])
+                moved = min(
+                    self._min_partition_size - sizes[partition_id],
+                    sizes[donor_id] - self._min_partition_size,
+                    counts[label_id, donor_id],
+                )
+                counts[label_id, donor_id] -= moved
+                counts[label_id, partition_id] += moved
+                sizes[donor_id] -= moved
+                sizes[partition_id] += moved
+
+
+def allocate(total: int, weights: np.ndarray) -> np.ndarray:
+    quotas = total * weights / weights.sum()
+    counts = np.floor(quotas).astype(np.int64)
+    remainder = total - int(counts.sum())
+    counts[np.argsort(counts - quotas, kind="stable")[:remainder]] += 1
+
+    return counts
+
+
+class NativeQuantitySkewPartitioner(IndexedPartitioner):
+    def __init__(
+        self,
+        num_partitions: int,
+        partition_by: str,
+        size_distribution: Literal["power_law", "lognormal"] = "power_law",
+        size_param: float = 1.5,
+        size_weights: list[float] | None = None,
+        label_alpha: float | None = None,
+        min_partition_size: int = 1,
+        shuffle: bool = True,
+        seed: int | None = 42,
+    ) -> None:
+        super().__init__()
+        if num_partitions <= 0:
+            raise ValueError("The number of partitions must be greater than zero.")
+        if size_weights is not None and not 0 < len(size_weights) <= num_partitions:
+            raise ValueError(
+                f"size_weights must have between 1 and {num_partitions} weights, "
+                f"got {len(size_weights)}."
+            )
+
+        self._num_partitions = num_partitions
+        self._partition_by = partition_by
+        self._size_distribution = size_distribution
+        self._size_param = size_param
+        self._size_weights = size_weights
+        self._label_alpha = label_alpha
+        self._min_partition_size = min_partition_size
+        self._shuffle = shuffle
+        self._rng = np.random.default_rng(seed)
+
+    def _compute_partition_index(self) -> PartitionIndex:
+        num_rows = self.dataset.num_rows
+        if self._num_partitions * self._min_partition_size > num_rows:
+            raise ValueError(
+                f"The dataset has {num_rows} samples, not enough for "
+                f"{self._num_partitions} partitions of at least "
+                f"{self._min_partition_size} samples."
+            )
+
+        sizes = self._min_partition_size + allocate(
+            num_rows - self._num_partitions * self._min_partition_size,
+            self._partition_weights(),
+        )
+
+        if self._label_alpha is None:
+            offsets = np.zeros(self._num_partitions + 1, dtype=np.int64)
+            np.cumsum(sizes, out=offsets[1:])
+            indices = np.arange(num_rows, dtype=PartitionIndex.index_dtype(num_rows))
+            if self._shuffle:
+                self._rng.shuffle(indices)
+            return PartitionIndex(offsets, indices)
+
+        labels = column_array(self.dataset, self._partition_by)
+        _, label_counts, label_offsets, label_to_indices = group_by_label(labels)
+        if self._shuffle:
+            for label_id in range(len(label_counts)):
+                self._rng.shuffle(
+                    label_to_indices[
+                        label_offsets[label_id] : label_offsets[label_id + 1]
+                    ]
+                )
+
+        counts = self._label_counts(sizes, label_counts)
+        starts = label_offsets[:-1] + np.cumsum(counts, axis=0) - counts
+        partition_ids, label_ids = np.nonzero(counts)
+        partition_index = assemble_partition_index(
+            label_to_indices,
+            starts[partition_ids, label_ids],
+            counts[partition_ids, label_ids],
+            partition_ids,
+            self._num_partitions,
+        )
+
+        if self._shuffle:
+            shuffle_partitions(partition_index, self._rng)
+
+        return partition_index
+
+    def _partition_weights(self) -> np.ndarray:
+        if self._size_weights is not None:
+            weights = np.asarray(self._size_weights, dtype=np.float64)
+            weights = np.concatenate(
+                [
+                    weights,
+                    np.full(self._num_partitions - len(weights), weights.mean()),
+                ]
+            )
+        elif self._size_distribution == "power_law":
+            weights = self._rng.pareto(self._size_param, self._num_partitions) + 1.0
+        elif self._size_distribution == "lognormal":
+            weights = self._rng.lognormal(0.0, self._size_param, self._num_partitions)
+        else:
+            raise ValueError(
+                f"Invalid size_distribution: {self._size_distribution}. "
+                f"Must be one of ('power_law', 'lognormal')"
+            )
+
+        if np.any(weights < 0) or weights.sum() <= 0:
+            raise ValueError("The partition size weights must be non-negative.")
+
+        return weights
+
+    def _label_counts(self, sizes: np.ndarray, label_counts: np.ndarray) -> np.ndarray:
+        proportions = self._rng.gamma(
+            self._label_alpha, size=(self._num_partitions, len(label_counts))
+        )
+        proportions[proportions.sum(axis=1) == 0] = 1.0
+
+        counts = np.zeros_like(proportions, dtype=np.int64)
+        remaining = label_counts.astype(np.int64)
+
+        for partition_id in self._rng.permutation(self._num_partitions):
+            wanted = np.minimum(
+                allocate(sizes[partition_id], proportions[partition_id]), remaining
+            )
+            deficit = sizes[partition_id] - wanted.sum()
+            if deficit > 0:
+                wanted += np.minimum(
+                    allocate(deficit, remaining - wanted), remaining - wanted
+                )
+            counts[partition_id] = wanted
+            remaining -= wanted
+
+        return counts
@@ -6,10 +6,15 @@ from netfl.utils.initializer import (
     EXPERIMENT_ENV_VAR,
     AppType,
     get_args,
-    serve_task_file,
+    write_task_shards,
+    serve_task_files,
     start_server,
+    prepare_task_dataset,
+    write_task_partition_statistics,
+    validate_server_args,
     validate_client_args,
     download_task_file,
+    download_task_shard,
     start_client,
     validate_task_dir,
 )
@@ -26,17 +31,28 @@ def main():
     current_dir = getcwd()
 
     if args.type == AppType.SERVER:
+        validate_server_args(args)
         validate_task_dir(current_dir)
         setup_log_file(getenv(EXPERIMENT_ENV_VAR, ""))
         task = load_task()
-        serve_task_file()
+        write_task_shards(task)
+        serve_task_files(task)
         start_server(args, task)
     elif args.type == AppType.CLIENT:
         validate_client_args(args)
         wait_server_reachable(args.server_address, args.server_port)
         download_task_file(args.server_address)
         task = load_task()
+        download_task_shard(args.server_address, args.client_id, task)
         start_client(args, task)
+    elif args.type == AppType.PREPARE:
+        validate_task_dir(current_dir)
+        task = load_task()
+        prepare_task_dataset(task)
+    elif args.type == AppType.STATISTICS:
+        validate_task_dir(current_dir)
+        task = load_task()
+        write_task_partition_statistics(task)
     else:
         raise ValueError(f"Unsupported application type: {args.type}.")
 
@@ -0,0 +1,94 @@
+import io
+
+import numpy as np
+from keras import models
+from flwr.common import Parameters
+
+
+TENSOR_TYPE = "numpy.ndarray"
+
+
+def array_header(dtype: np.dtype, shape: tuple[int, ...]) -> bytes:
+    f = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        f,
+        {
+            "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+            "fortran_order": False,
+            "shape": tuple(shape),
+        },
+    )
+    return f.getvalue()
+
+
+def ndarray_to_bytes(array: np.ndarray) -> bytes:
+    header = array_header(array.dtype, np.shape(array))
+    return b"".join((header, memoryview(np.ascontiguousarray(array)).cast("B")))
+
+
+def bytes_to_ndarray_view(tensor: bytes) -> np.ndarray:
+    f = io.BytesIO(tensor)
+    version = np.lib.format.read_magic(f)
+
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+    array = np.frombuffer(
+        tensor, dtype=dtype, count=int(np.prod(shape)), offset=f.tell()
+    )
+
+    if fortran_order:
+        return array.reshape(shape[::-1]).T
+    return array.reshape(shape)
+
+
+def arrays_to_parameters(arrays: list[np.ndarray]) -> Parameters:
+    return Parameters(
+        tensors=[ndarray_to_bytes(array) for array in arrays], tensor_type=TENSOR_TYPE
+    )
+
+
+def parameters_to_arrays(parameters: Parameters) -> list[np.ndarray]:
+    return [bytes_to_ndarray_view(tensor) for tensor in parameters.tensors]
+
+
+def set_model_weights(model: models.Model, arrays: list[np.ndarray]) -> None:
+    variables = model.weights
+    if len(variables) != len(arrays):
+        raise ValueError(
+            f"The model has {len(variables)} weights, got {len(arrays)} arrays."
+        )
+
+    for variable, array in zip(variables, arrays):
+        if tuple(variable.shape) != array.shape:
+            raise ValueError(
+                f"Weight '{variable.path}' has shape {tuple(variable.shape)}, "
+                f"got an array of shape {array.shape}."
+            )
+        variable.assign(array)
+
+
+class WeightsSerializer:
+    def __init__(self, model: models.Model) -> None:
+        self._model = model
+        self._headers: list[bytes] = []
+
+        for variable in model.weights:
+            self._headers.append(
+                array_header(np.dtype(variable.dtype), tuple(variable.shape))
+            )
+
+    def arrays(self) -> list[np.ndarray]:
+        return [
+            np.ascontiguousarray(variable.value) for variable in self._model.weights
+        ]
+
+    def parameters(self) -> Parameters:
+        tensors = [
+            b"".join((header, memoryview(array).cast("B")))
+            for header, array in zip(self._headers, self.arrays())
+        ]
+
+        return Parameters(tensors=tensors, tensor_type=TENSOR_TYPE)